@@ -1,9 +1,19 @@
 from fastapi import APIRouter, Depends
 from app.core.auth import authGuard
 from app.core.database import Base, engine
-from app.api.endpoints import users, auth, cv, register, generate
+from app.core.indexes import report_missing_indexes
+from app.core.log_partitions import prepare_logs_table, maintain_log_partitions
+from app.core.profiling import profile_admin_guard
+from app.api.endpoints import users, auth, cv, register, generate, profiles
 
+prepare_logs_table(engine)
 Base.metadata.create_all(bind=engine)
+report_missing_indexes(engine)
+try:
+    maintain_log_partitions(engine)
+except Exception as e:
+    # El bucle de mantenimiento lo reintenta; no se deja a los workers sin arrancar
+    print(f"Log partition maintenance failed: {e}")
 
 api_router = APIRouter()
 
@@ -11,4 +21,5 @@ api_router.include_router(users.router, prefix="/users", tags=["users"], depende
 api_router.include_router(register.router, prefix="/register", tags=["register"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(cv.router, prefix="/cv", tags=["cv"], dependencies=[Depends(authGuard)])
-api_router.include_router(generate.router, prefix="/generate", tags=["generate"], dependencies=[Depends(authGuard)])
\ No newline at end of file
+api_router.include_router(generate.router, prefix="/generate", tags=["generate"], dependencies=[Depends(authGuard)])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["profiles"], dependencies=[Depends(profile_admin_guard)])
\ No newline at end of file
@@ -1,17 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.auth import tokenClaims
+from app.core.database import get_session
 from app.schemas.auth import AuthLogin, AuthResponse
 from app.services import auth_services
 
 router = APIRouter()
 
 @router.post("/login", response_model=AuthResponse)
-async def login(auth: AuthLogin,  db: Session = Depends(get_db)):
-    result = auth_services.login(db, auth)
+async def login(auth: AuthLogin,  db: Session | AsyncSession = Depends(get_session)):
+    result = await auth_services.login(db, auth)
     if not result:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
-    return result
\ No newline at end of file
+    return result
+
+@router.post("/logout")
+async def logout(claims: dict = Depends(tokenClaims), db: Session | AsyncSession = Depends(get_session)):
+    return await auth_services.logout_async(db, claims)
\ No newline at end of file
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_session
 from app.core.auth import authGuard
 from app.services import cv_services
 from app.models.user import User
@@ -8,227 +10,269 @@ from app.schemas.cv import *
 
 router = APIRouter()
 
+def _cache_headers(etag: str) -> dict:
+    # no-cache: el cliente puede guardar la respuesta pero revalida siempre con If-None-Match
+    return {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match se compara en modo débil (RFC 9110)
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+async def cv_etag(
+        request: Request,
+        response: Response,
+        db: Session | AsyncSession = Depends(get_session),
+        current_user: User = Depends(authGuard)
+    ) -> Optional[str]:
+    # Se resuelve antes que el endpoint: un 304 no llega a cargar ninguna sección
+    version = await cv_services.get_cv_version_async(db, current_user.id)
+    if version is None:
+        return None
+
+    etag = f'"cv-{current_user.id}-{version}"'
+    headers = _cache_headers(etag)
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return etag
+
 # CV
 @router.get('', response_model=CvResponse)
 async def get_cv(
-        db: Session = Depends(get_db), 
-        current_user: User = Depends(authGuard)
+        db: Session | AsyncSession = Depends(get_session), 
+        current_user: User = Depends(authGuard),
+        etag: Optional[str] = Depends(cv_etag)
     ):
-    result = cv_services.get_cv(db, current_user.id)
+    headers = _cache_headers(etag) if etag else None
+
+    if cv_services.CV_DOCUMENT_READS:
+        document = await cv_services.get_cv_document_async(db, current_user.id)
+        return Response(content=document, media_type="application/json", headers=headers)
+
+    if cv_services.CV_JSON_FROM_DB:
+        document = await cv_services.get_cv_json_async(db, current_user.id)
+        return Response(content=document, media_type="application/json", headers=headers)
+
+    result = await cv_services.get_cv_async(db, current_user.id)
     return result
 
 # CV Personal Info Endpoints
-@router.get('/personal-info', response_model=CvPersonalInfoResponse)
+@router.get('/personal-info', response_model=CvPersonalInfoResponse, dependencies=[Depends(cv_etag)])
 async def get_cv_personal_info(
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.get_cv_personal_info(db, current_user.id)
+    result = await cv_services.get_cv_personal_info_async(db, current_user.id)
     return result
 
 @router.post('/personal-info', response_model=CvPersonalInfoResponse)
 async def set_cv_personal_info( 
         data: CvPersonalInfoCreate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.set_cv_personal_info(db, current_user.id, data)
+    result = await cv_services.set_cv_personal_info_async(db, current_user.id, data)
     return result
 
 @router.patch('/personal-info', response_model=CvPersonalInfoResponse)
 async def patch_cv_personal_info( 
         data: CvPersonalInfoCreate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.patch_cv_personal_info(db, current_user.id, data)
+    result = await cv_services.patch_cv_personal_info_async(db, current_user.id, data)
     return result
 
 # CV Education Endpoints 
-@router.get('/education', response_model=list[CvEducationResponse])
+@router.get('/education', response_model=list[CvEducationResponse], dependencies=[Depends(cv_etag)])
 async def get_cv_education(
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.get_cv_education(db, current_user.id)
+    result = await cv_services.get_cv_education_async(db, current_user.id)
     return result
 
 @router.post('/education', response_model=CvEducationResponse)
 async def set_cv_education( 
         data: CvEducationCreate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.set_cv_education(db, current_user.id, data)
+    result = await cv_services.set_cv_education_async(db, current_user.id, data)
     return result
 
 @router.patch('/education', response_model=CvEducationResponse)
 async def patch_cv_education( 
         data: CvEducationUpdate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.patch_cv_education(db, current_user.id, data)
+    result = await cv_services.patch_cv_education_async(db, current_user.id, data)
     return result
 
 # CV Experience Endpoints 
-@router.get('/experience', response_model=list[CvExperienceResponse])
+@router.get('/experience', response_model=list[CvExperienceResponse], dependencies=[Depends(cv_etag)])
 async def get_cv_experience(
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.get_cv_experience(db, current_user.id)
+    result = await cv_services.get_cv_experience_async(db, current_user.id)
     return result
 
 @router.post('/experience', response_model=CvExperienceResponse)
 async def set_cv_experience( 
         data: CvExperienceCreate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.set_cv_experience(db, current_user.id, data)
+    result = await cv_services.set_cv_experience_async(db, current_user.id, data)
     return result
 
 @router.patch('/experience', response_model=CvExperienceResponse)
 async def patch_cv_experience( 
         data: CvExperienceUpdate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.patch_cv_experience(db, current_user.id, data)
+    result = await cv_services.patch_cv_experience_async(db, current_user.id, data)
     return result
 
-@router.get('/experience/responsibilities', response_model=list[CvExperienceResponsibilitiesResponse])
+@router.get('/experience/responsibilities', response_model=list[CvExperienceResponsibilitiesResponse], dependencies=[Depends(cv_etag)])
 async def get_cv_experience_responsibilities(
         experience_id: int,
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.get_cv_experience_responsibilities(db, current_user.id, experience_id)
+    result = await cv_services.get_cv_experience_responsibilities_async(db, current_user.id, experience_id)
     return result
 
 @router.post('/experience/responsibilities', response_model=CvExperienceResponsibilitiesResponse)
 async def set_cv_experience_responsibilities( 
         data: CvExperienceResponsibilitiesCreate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.set_cv_experience_responsibilities(db, current_user.id, data)
+    result = await cv_services.set_cv_experience_responsibilities_async(db, current_user.id, data)
     return result
 
 @router.patch('/experience/responsibilities', response_model=CvExperienceResponsibilitiesResponse)
 async def patch_cv_experience_responsibilities( 
         data: CvExperienceResponsibilitiesUpdate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.patch_cv_experience_responsibilities(db, current_user.id, data)
+    result = await cv_services.patch_cv_experience_responsibilities_async(db, current_user.id, data)
     return result
 
-@router.get('/experience/achievements', response_model=list[CvExperienceAchievementsResponse])
+@router.get('/experience/achievements', response_model=list[CvExperienceAchievementsResponse], dependencies=[Depends(cv_etag)])
 async def get_cv_experience_achievements(
         experience_id: int,
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.get_cv_experience_achievements(db, current_user.id, experience_id)
+    result = await cv_services.get_cv_experience_achievements_async(db, current_user.id, experience_id)
     return result
 
 @router.post('/experience/achievements', response_model=CvExperienceAchievementsResponse)
 async def set_cv_experience_achievements( 
         data: CvExperienceAchievementsCreate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.set_cv_experience_achievements(db, current_user.id, data)
+    result = await cv_services.set_cv_experience_achievements_async(db, current_user.id, data)
     return result
 
 @router.patch('/experience/achievements', response_model=CvExperienceAchievementsResponse)
 async def patch_cv_experience_achievements( 
         data: CvExperienceAchievementsUpdate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.patch_cv_experience_achievements(db, current_user.id, data)
+    result = await cv_services.patch_cv_experience_achievements_async(db, current_user.id, data)
     return result
 
 # CV Project Endpoints 
-@router.get('/project', response_model=list[CvProjectResponse])
+@router.get('/project', response_model=list[CvProjectResponse], dependencies=[Depends(cv_etag)])
 async def get_cv_project(
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.get_cv_project(db, current_user.id)
+    result = await cv_services.get_cv_project_async(db, current_user.id)
     return result
 
 @router.post('/project', response_model=CvProjectResponse)
 async def set_cv_project( 
         data: CvProjectCreate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.set_cv_project(db, current_user.id, data)
+    result = await cv_services.set_cv_project_async(db, current_user.id, data)
     return result
 
 @router.patch('/project', response_model=CvProjectResponse)
 async def patch_cv_project( 
         data: CvProjectUpdate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.patch_cv_project(db, current_user.id, data)
+    result = await cv_services.patch_cv_project_async(db, current_user.id, data)
     return result
 
-@router.get('/project/achievements', response_model=list[CvProjectAchievementsResponse])
+@router.get('/project/achievements', response_model=list[CvProjectAchievementsResponse], dependencies=[Depends(cv_etag)])
 async def get_cv_project_achievements(
         project_id: int,
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.get_cv_project_achievements(db, current_user.id, project_id)
+    result = await cv_services.get_cv_project_achievements_async(db, current_user.id, project_id)
     return result
 
 @router.post('/project/achievements', response_model=CvProjectAchievementsResponse)
 async def set_cv_project_achievements( 
         data: CvProjectAchievementsCreate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.set_cv_project_achievements(db, current_user.id, data)
+    result = await cv_services.set_cv_project_achievements_async(db, current_user.id, data)
     return result
 
 @router.patch('/project/achievements', response_model=CvProjectAchievementsResponse)
 async def patch_cv_project_achievements( 
         data: CvProjectAchievementsUpdate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.patch_cv_project_achievements(db, current_user.id, data)
+    result = await cv_services.patch_cv_project_achievements_async(db, current_user.id, data)
     return result
 
 # CV Project Endpoints 
-@router.get('/skill', response_model=list[CvSkillResponse])
+@router.get('/skill', response_model=list[CvSkillResponse], dependencies=[Depends(cv_etag)])
 async def get_cv_skill(
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.get_cv_skill(db, current_user.id)
+    result = await cv_services.get_cv_skill_async(db, current_user.id)
     return result
 
 @router.post('/skill', response_model=CvSkillResponse)
 async def set_cv_skill( 
         data: CvSkillCreate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.set_cv_skill(db, current_user.id, data)
+    result = await cv_services.set_cv_skill_async(db, current_user.id, data)
     return result
 
 @router.patch('/skill', response_model=CvSkillResponse)
 async def patch_cv_skill( 
         data: CvSkillUpdate, 
-        db: Session = Depends(get_db), 
+        db: Session | AsyncSession = Depends(get_session), 
         current_user: User = Depends(authGuard)
     ):
-    result = cv_services.patch_cv_skill(db, current_user.id, data)
+    result = await cv_services.patch_cv_skill_async(db, current_user.id, data)
     return result
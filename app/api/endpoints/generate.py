@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends
 from huggingface_hub import User
-from requests import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from app.core.auth import authGuard
-from app.core.database import get_db
+from app.core.database import get_session, run_in_session
 from app.services.generate_cv_services import generate_cv, generate_cv_ia
 from app.schemas.generate import CvGenerateAIRequest
 
@@ -10,10 +11,10 @@ router = APIRouter()
 
 @router.get('')
 async def cv_generate_cv(
-    db: Session = Depends(get_db), 
+    db: Session | AsyncSession = Depends(get_session),
     current_user: User = Depends(authGuard)
     ):
-    cv_json = generate_cv(db=db, user_id=current_user.id)
+    cv_json = await run_in_session(db, generate_cv, current_user.id)
     if cv_json is None:
         return {"detail": "Error generating CV"}
     return {"cv": cv_json}
@@ -21,11 +22,11 @@ async def cv_generate_cv(
 @router.post('/ia')
 async def cv_generate_cv_ia(
     job_offer: CvGenerateAIRequest,
-    db: Session = Depends(get_db), 
+    db: Session | AsyncSession = Depends(get_session),
     current_user: User = Depends(authGuard),
     ):
 
-    cv_json = generate_cv_ia(db=db, user_id=current_user.id, job_offer=job_offer)
+    cv_json = await run_in_session(db, generate_cv_ia, current_user.id, job_offer)
     if cv_json is None:
         return {"detail": "Error generating CV"}
     return {"cv": cv_json}
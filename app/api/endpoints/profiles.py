@@ -0,0 +1,12 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from app.core.profiling import profile_path
+
+router = APIRouter()
+
+@router.get("/{profile_id}")
+async def get_profile(profile_id: str):
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_session
 from app.schemas.user import UserCreate, UserResponse
 from app.services import user_service
 
 router = APIRouter()
 
 @router.post("", response_model = UserResponse)
-async def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    return user_service.create_user_service(db=db, user=user)
\ No newline at end of file
+async def create_user(user: UserCreate, db: Session | AsyncSession = Depends(get_session)):
+    return await user_service.create_user_service(db=db, user=user)
\ No newline at end of file
@@ -1,11 +1,21 @@
+import hashlib
 import os
+import time
+from datetime import datetime
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from app.core.database import get_db
-from sqlalchemy.orm import Session
+from app.core.cache import TTLCache, invalidate_after_commit
+from app.core.database import DB_ASYNC, get_async_db, get_db
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 from jose import JWTError, jwt
 from app.core.vault import *
+from app.core.revocation import revocation_list
+from app.core.security import ACCESS_TOKEN_TTL
+from app.models.user import RevokedToken, User
+from app.schemas.auth import Principal
 from app.services import user_service
 from typing import Optional
 
@@ -14,12 +24,54 @@ load_dotenv()
 JWT_SECRET_KEY = get_jwt_secret_key()
 ALGORITHM = "HS256"
 
+# Con AUTH_STATELESS authGuard construye un Principal a partir de los claims sin consultar la base de datos
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "false").lower() == "true"
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+JWT_CACHE_MAX_TTL = float(os.getenv("JWT_CACHE_MAX_TTL", "3600"))
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))
+
+# Usuarios autenticados por `sub`; se guardan desasociados de la sesión
+user_cache = TTLCache("user", max_entries=USER_CACHE_MAX_ENTRIES, ttl=USER_CACHE_TTL)
+
+# Claims de tokens ya verificados, por sha256 del token y hasta su `exp`
+token_cache = TTLCache("jwt", max_entries=JWT_CACHE_MAX_ENTRIES, ttl=JWT_CACHE_MAX_TTL)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User):
+    # Desactivar un usuario revoca también los tokens que ya tiene emitidos
+    is_active = inspect(target).attrs.is_active.history
+    if is_active.added and not is_active.added[0]:
+        now = datetime.utcnow()
+        connection.execute(insert(RevokedToken).values(
+            user_id=target.id,
+            revoked_at=now,
+            expires_at=now + ACCESS_TOKEN_TTL,
+        ))
+
+    db = object_session(target)
+    if db is not None:
+        invalidate_after_commit(db, user_cache, str(target.id), connection=connection)
+    else:
+        user_cache.pop(str(target.id))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
     
-def authGuard(
-    token: str = Depends(oauth2_scheme),
-) : 
-    
+def _decode_token(token: str) -> dict:
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[ALGORITHM])
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(digest, payload, ttl=exp - time.time())
+    return payload
+
+def tokenClaims(token: str = Depends(oauth2_scheme)) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -27,7 +79,7 @@ def authGuard(
     )
 
     try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _decode_token(token)
         user_id: Optional[int] = payload.get("sub")
 
         if user_id is None:
@@ -35,9 +87,61 @@ def authGuard(
     except JWTError:
         raise credentials_exception
 
-    db: Session = next(get_db())
-    user = user_service.get_user_service_by_id(db, user_id=user_id)
-    if user is None:
+    if revocation_list.is_revoked(payload):
         raise credentials_exception
-    
-    return user
\ No newline at end of file
+
+    return payload
+
+def _cached_user(payload: dict):
+    user_id = payload["sub"]
+
+    if AUTH_STATELESS:
+        return Principal(
+            id=int(user_id),
+            email=payload.get("email"),
+            firstname=payload.get("firstname"),
+            lastname=payload.get("lastname"),
+        )
+
+    return user_cache.get(str(user_id))
+
+def _remember_user(db: Session | AsyncSession, user_id, user: User | None):
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    db.expunge(user)
+    user_cache.set(str(user_id), user)
+    return user
+
+# get_db se cachea por request en FastAPI: authGuard y el endpoint comparten la misma sesión
+def authGuardSync(
+    payload: dict = Depends(tokenClaims),
+    db: Session = Depends(get_db),
+) : 
+    user = _cached_user(payload)
+    if user is not None:
+        return user
+
+    user_id = payload["sub"]
+    user = user_service.get_user_service_by_id(db, user_id=user_id)
+    return _remember_user(db, user_id, user)
+
+async def authGuardAsync(
+    payload: dict = Depends(tokenClaims),
+    db: AsyncSession = Depends(get_async_db),
+) : 
+    user = _cached_user(payload)
+    if user is not None:
+        return user
+
+    user_id = payload["sub"]
+    # asyncpg no convierte tipos: `sub` llega como string en el token
+    user = await user_service.get_user_service_by_id_async(db, user_id=int(user_id))
+    return _remember_user(db, user_id, user)
+
+# Con DB_ASYNC la carga del usuario va por asyncpg y comparte la AsyncSession de get_session
+authGuard = authGuardAsync if DB_ASYNC else authGuardSync
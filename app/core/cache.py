@@ -0,0 +1,150 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from sqlalchemy import Connection, event, text
+from sqlalchemy.orm import Session
+
+from app.core.metrics import CACHE_REQUESTS
+
+_MISSING = object()
+
+# Canal de Postgres por el que los workers se avisan de las invalidaciones
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+# Cachés por nombre, para que el listener de NOTIFY encuentre la del aviso
+caches: dict[str, "TTLCache"] = {}
+
+class TTLCache:
+    # LRU acotado con caducidad por entrada; seguro entre el event loop y el threadpool
+    def __init__(self, name: str, max_entries: int, ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Generación de cada clave: sube con cada pop, así una carga que empezó antes
+        # de una invalidación no vuelve a guardar el valor viejo
+        self._generation = 0
+        self._popped: OrderedDict[Hashable, int] = OrderedDict()
+        self._popped_floor = 0
+        caches[name] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                CACHE_REQUESTS.labels(self.name, "hit").inc()
+                return entry[1]
+            if entry is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+        CACHE_REQUESTS.labels(self.name, "miss").inc()
+        return default
+
+    def generation(self) -> int:
+        # Se toma antes de leer la base de datos y se pasa a set/update
+        with self._lock:
+            return self._generation
+
+    def _is_stale(self, key: Hashable, generation: Optional[int]) -> bool:
+        return generation is not None and self._popped.get(key, self._popped_floor) > generation
+
+    def _bump(self, key: Hashable):
+        self._generation += 1
+        self._popped[key] = self._generation
+        self._popped.move_to_end(key)
+        # Solo se recuerdan las últimas claves; las olvidadas cuentan como invalidadas en el suelo
+        while len(self._popped) > max(self.max_entries, 1):
+            _, generation = self._popped.popitem(last=False)
+            self._popped_floor = generation
+
+    def _store(self, key: Hashable, expires: float, value: Any):
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def _ttl(self, ttl: Optional[float]) -> float:
+        return self.ttl if ttl is None else min(ttl, self.ttl)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, generation: Optional[int] = None):
+        if not self.enabled:
+            return
+        ttl = self._ttl(ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if self._is_stale(key, generation):
+                return
+            self._store(key, time.monotonic() + ttl, value)
+
+    def update(self, key: Hashable, changes: dict, ttl: Optional[float] = None, generation: Optional[int] = None):
+        # Mezcla changes en el dict guardado bajo el lock, sin pisar lo que otro haya guardado
+        # mientras tanto; la entrada conserva su caducidad
+        if not self.enabled:
+            return
+        ttl = self._ttl(ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if self._is_stale(key, generation):
+                return
+            entry = self._data.get(key)
+            now = time.monotonic()
+            if entry is not None and entry[0] > now:
+                self._store(key, entry[0], {**entry[1], **changes})
+            else:
+                self._store(key, now + ttl, dict(changes))
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+            self._bump(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+            self._popped.clear()
+            self._popped_floor = self._generation
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+def invalidate_after_commit(db: Session, cache: TTLCache, key: Hashable, connection: Optional[Connection] = None):
+    # Se invalida ya y otra vez tras el commit, para que una lectura concurrente
+    # entre el flush y el commit no deje en caché la versión anterior.
+    cache.pop(key)
+    db.info.setdefault("cache_invalidations", []).append((cache, key))
+    # NOTIFY dentro de la transacción: Postgres solo lo entrega a los demás workers si hay commit.
+    # Desde un listener de mapper hay que pasar su `connection`, la sesión está en pleno flush.
+    (connection or db.connection()).execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": INVALIDATION_CHANNEL, "payload": json.dumps({"cache": cache.name, "key": key})},
+    )
+
+def apply_invalidation(payload: str):
+    message = json.loads(payload)
+    cache = caches.get(message.get("cache"))
+    if cache is not None:
+        cache.pop(message.get("key"))
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session):
+    for cache, key in session.info.pop("cache_invalidations", []):
+        cache.pop(key)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session):
+    session.info.pop("cache_invalidations", None)
@@ -0,0 +1,53 @@
+import asyncio
+import os
+import random
+from dotenv import load_dotenv
+
+from app.core.cache import INVALIDATION_CHANNEL, apply_invalidation, caches
+from app.core.database import engine
+
+load_dotenv()
+
+CACHE_LISTENER_RETRY_INTERVAL = float(os.getenv("CACHE_LISTENER_RETRY_INTERVAL", "5"))
+
+def _connect():
+    # Conexión propia fuera del pool: queda abierta mientras viva el worker
+    cargs, cparams = engine.dialect.create_connect_args(engine.url)
+    cparams.update(keepalives=1, keepalives_idle=30, keepalives_interval=10, keepalives_count=3)
+    connection = engine.dialect.dbapi.connect(*cargs, **cparams)
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {INVALIDATION_CHANNEL}")
+    return connection
+
+async def run_cache_listener():
+    loop = asyncio.get_running_loop()
+    while True:
+        connection = None
+        try:
+            connection = await asyncio.to_thread(_connect)
+            # Los avisos publicados mientras no había conexión se han perdido
+            for cache in caches.values():
+                cache.clear()
+
+            readable = asyncio.Event()
+            loop.add_reader(connection.fileno(), readable.set)
+            try:
+                while True:
+                    await readable.wait()
+                    readable.clear()
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        try:
+                            apply_invalidation(notify.payload)
+                        except ValueError as e:
+                            print(f"Invalid cache invalidation payload: {e}")
+            finally:
+                loop.remove_reader(connection.fileno())
+        except Exception as e:
+            print(f"Cache invalidation listener failed: {e}")
+        finally:
+            if connection is not None:
+                connection.close()
+        await asyncio.sleep(CACHE_LISTENER_RETRY_INTERVAL * random.uniform(0.8, 1.2))
@@ -1,7 +1,10 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from dotenv import load_dotenv
+from app.core.metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_pool
+from app.core.query_stats import instrument_queries
 import os
 
 load_dotenv()
@@ -13,15 +16,97 @@ SQLALCHEMY_DATABASE_URL = (
     f"postgresql+psycopg2://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}"
     f"@{DB_HOST}:{DB_PORT}/{os.getenv('POSTGRES_DB')}"
 )
+ASYNC_SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("+psycopg2", "+asyncpg", 1)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Con DB_ASYNC los endpoints de CV, usuarios y auth usan asyncpg en lugar de psycopg2
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+# Valores por defecto iguales a los de SQLAlchemy salvo pre-ping y recycle;
+# cada worker de uvicorn tiene su propio pool.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", str(DB_POOL_SIZE)))
+# statement_timeout en milisegundos aplicado por Postgres; 0 lo desactiva
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+connect_args = {}
+if DB_STATEMENT_TIMEOUT_MS > 0:
+    connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=connect_args,
+)
+instrument_pool(engine)
+instrument_queries(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_connect_args = {}
+if DB_STATEMENT_TIMEOUT_MS > 0:
+    async_connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=async_connect_args,
+)
+instrument_pool(async_engine.sync_engine)
+instrument_queries(async_engine.sync_engine)
+# Sin expirar en commit: tras el commit no se puede hacer lazy load fuera del greenlet
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+def prewarm_pool():
+    # Abre las conexiones a la vez y las devuelve al pool para que los primeros requests no paguen el connect
+    count = min(DB_POOL_PREWARM, DB_POOL_SIZE)
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+async def prewarm_async_pool():
+    count = min(DB_POOL_PREWARM, DB_POOL_SIZE)
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(await async_engine.connect())
+    finally:
+        for connection in connections:
+            await connection.close()
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+get_session = get_async_db if DB_ASYNC else get_db
+
+async def run_in_session(db: Session | AsyncSession, fn, *args):
+    # Con AsyncSession el código ORM síncrono corre en el greenlet de asyncpg sin bloquear el event loop
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args)
+    return fn(db, *args)
\ No newline at end of file
@@ -0,0 +1,120 @@
+# Crea los índices de los modelos que falten en tablas ya existentes (create_all solo
+# los crea con la tabla). Corre como paso aparte, sin bloquear el arranque de la API:
+#   python -m app.core.indexes
+# Usa CREATE INDEX CONCURRENTLY, que no bloquea las escrituras. Antes de cada índice único
+# quita las filas duplicadas que ya hubiera. Termina con error si algún índice no se crea;
+# la API arranca igual y avisa de los que faltan.
+import json
+import sys
+
+from sqlalchemy import Index, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+import app.models  # noqa: F401  registra todas las tablas en Base.metadata
+from app.core.cache import INVALIDATION_CHANNEL
+from app.core.database import Base, engine
+from app.services.cv_services import _rebuild_cv_document, cv_cache
+
+# Clave arbitraria para que dos despliegues no construyan los mismos índices a la vez
+_INDEX_LOCK_KEY = 815_204_003
+
+_index_state = text("""
+SELECT i.indisvalid
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+WHERE c.oid = to_regclass(:name)
+""")
+
+_table_kind = text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)")
+
+def missing_indexes(conn: Connection) -> list[Index]:
+    # Solo tablas normales ya creadas: CONCURRENTLY no vale para la tabla particionada de logs
+    # y sus índices los crea create_all. Un índice inválido es un CONCURRENTLY que falló.
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if conn.execute(_table_kind, {"name": f'"{table.name}"'}).scalar() != "r":
+            continue
+        for index in table.indexes:
+            if conn.execute(_index_state, {"name": f'"{index.name}"'}).scalar() is not True:
+                missing.append(index)
+    return missing
+
+def _create_concurrently(conn: Connection, index: Index):
+    options = index.dialect_options["postgresql"]
+    options["concurrently"] = True
+    try:
+        index.create(bind=conn)
+    finally:
+        options["concurrently"] = False
+
+def _remove_duplicates(bind: Engine, index: Index) -> int:
+    # Se queda la fila de menor id de cada grupo; PARTITION BY agrupa los NULL igual que
+    # NULLS NOT DISTINCT. Los hijos (logros, responsabilidades) pasan a la fila que queda.
+    table = index.table
+    columns = ", ".join(str(expression.compile(dialect=bind.dialect)) for expression in index.expressions)
+    with bind.begin() as conn:
+        conn.execute(text(f"""
+            CREATE TEMP TABLE duplicates ON COMMIT DROP AS
+            SELECT id, keep_id FROM (
+                SELECT id, first_value(id) OVER (PARTITION BY {columns} ORDER BY id) AS keep_id
+                FROM {table.name}
+            ) grouped
+            WHERE id <> keep_id
+        """))
+        for child in Base.metadata.sorted_tables:
+            for foreign_key in child.foreign_keys:
+                if foreign_key.column.table is table:
+                    conn.execute(text(
+                        f"UPDATE {child.name} SET {foreign_key.parent.name} = d.keep_id "
+                        f"FROM duplicates d WHERE {child.name}.{foreign_key.parent.name} = d.id"
+                    ))
+        user_ids = conn.execute(text(
+            f"DELETE FROM {table.name} USING duplicates d WHERE {table.name}.id = d.id RETURNING {table.name}.user_id"
+        )).scalars().all()
+        # El CV de esos usuarios cambió: se rehace cv_document y se avisa a las cachés de los workers
+        for user_id in set(user_ids):
+            _rebuild_cv_document(conn, user_id)
+            conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": INVALIDATION_CHANNEL, "payload": json.dumps({"cache": cv_cache.name, "key": user_id})},
+            )
+    if user_ids:
+        print(f"Removed {len(user_ids)} duplicate rows from {table.name}")
+    return len(user_ids)
+
+def create_missing_indexes(bind: Engine = engine) -> list[str]:
+    failed = []
+    # CONCURRENTLY no puede ir dentro de una transacción
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _INDEX_LOCK_KEY})
+        try:
+            for index in missing_indexes(conn):
+                try:
+                    conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'))
+                    # Solo los índices de entradas del CV; un email o un teléfono repetidos no se tocan
+                    if index.unique and index.name.startswith("uq_cv_"):
+                        _remove_duplicates(bind, index)
+                    _create_concurrently(conn, index)
+                    print(f"Index {index.name} created")
+                except SQLAlchemyError as e:
+                    # No se deja el índice inválido: Postgres lo seguiría manteniendo en cada escritura
+                    conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'))
+                    print(f"Index {index.name} could not be created: {e}")
+                    failed.append(index.name)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _INDEX_LOCK_KEY})
+    return failed
+
+def report_missing_indexes(bind: Engine = engine):
+    with bind.connect() as conn:
+        missing = [index.name for index in missing_indexes(conn)]
+    if missing:
+        print(f"Missing indexes, run python -m app.core.indexes: {', '.join(missing)}")
+
+if __name__ == "__main__":
+    # Las tablas que aún no existen se crean con sus índices al arrancar la app
+    failed = create_missing_indexes(engine)
+    if failed:
+        print(f"Missing indexes: {', '.join(failed)}")
+        sys.exit(1)
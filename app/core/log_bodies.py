@@ -0,0 +1,109 @@
+import gzip
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# zstd (paquete zstandard) o gzip; "none" guarda el texto plano como antes
+LOG_BODY_CODEC = os.getenv("LOG_BODY_CODEC", "zstd")
+# Bodies comprimidos por encima de este tamaño van al almacén de ficheros. Se comprime después
+# del recorte a LOG_BODY_MAX_BYTES (8000 por defecto), así que con los valores por defecto
+# nunca se llega aquí: el almacén solo se usa subiendo LOG_BODY_MAX_BYTES por encima del umbral
+LOG_BODY_SPILL_THRESHOLD = int(os.getenv("LOG_BODY_SPILL_THRESHOLD", "16384"))
+LOG_BODY_STORE_DIR = Path(os.getenv("LOG_BODY_STORE_DIR", "/var/lib/cv_back/log_bodies"))
+
+# Solo lo usa el writer del sink, un lote cada vez
+_zstd_compressor = None
+
+def _compress(data: bytes, codec: str) -> bytes:
+    global _zstd_compressor
+    if codec == "zstd":
+        if _zstd_compressor is None:
+            import zstandard
+            _zstd_compressor = zstandard.ZstdCompressor(level=3)
+        return _zstd_compressor.compress(data)
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    raise ValueError(f"Unknown log body codec: {codec}")
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    raise ValueError(f"Unknown log body codec: {codec}")
+
+def _store_path(digest: str) -> Path:
+    return LOG_BODY_STORE_DIR / digest[:2] / digest[2:4] / digest
+
+def _spill(blob: bytes) -> str:
+    # Direccionado por contenido: bodies repetidos comparten fichero
+    digest = hashlib.sha256(blob).hexdigest()
+    path = _store_path(digest)
+    if path.exists():
+        os.utime(path)
+        return digest
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(blob)
+    os.replace(tmp, path)
+    return digest
+
+def encode_row(row: dict) -> dict:
+    if LOG_BODY_CODEC == "none":
+        return row
+
+    encoded = dict(row)
+    for field in ("requestBody", "responseBody"):
+        text = encoded.pop(field, None)
+        if text is None:
+            continue
+        blob = _compress(text.encode("utf-8"), LOG_BODY_CODEC)
+        ref = None
+        if len(blob) > LOG_BODY_SPILL_THRESHOLD:
+            try:
+                ref = _spill(blob)
+            except OSError as e:
+                # Sin almacén (directorio, permisos, disco) el body va en la fila y no se pierde el lote
+                print(f"Log body spill failed, storing inline: {e}")
+        if ref is not None:
+            encoded[f"{field}Ref"] = ref
+        else:
+            encoded[f"{field}Blob"] = blob
+        encoded["bodyCodec"] = LOG_BODY_CODEC
+    return encoded
+
+def decode_body(text: Optional[str], blob: Optional[bytes], ref: Optional[str], codec: Optional[str]) -> Optional[str]:
+    if text is not None or codec is None:
+        return text
+    if blob is None and ref is not None:
+        try:
+            blob = _store_path(ref).read_bytes()
+        except OSError:
+            # El almacén no es un volumen: tras recrear el contenedor los ficheros ya no están
+            return f"<log body {ref} unavailable>"
+    if blob is None:
+        return None
+    return _decompress(bytes(blob), codec).decode("utf-8", errors="replace")
+
+def prune_body_store(max_age_days: int) -> int:
+    if not LOG_BODY_STORE_DIR.exists():
+        return 0
+
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for path in LOG_BODY_STORE_DIR.glob("*/*/*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
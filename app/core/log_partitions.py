@@ -0,0 +1,152 @@
+import asyncio
+import os
+import re
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.database import engine
+from app.core.log_bodies import prune_body_store
+from app.core.profiling import prune_profiles
+
+load_dotenv()
+
+LOG_PARTITION_INTERVAL = os.getenv("LOG_PARTITION_INTERVAL", "daily")
+LOG_PARTITIONS_AHEAD = int(os.getenv("LOG_PARTITIONS_AHEAD", "7"))
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "30"))
+LOG_PARTITION_MAINTENANCE_INTERVAL = float(os.getenv("LOG_PARTITION_MAINTENANCE_INTERVAL", "3600"))
+
+# Clave arbitraria para serializar el mantenimiento entre los workers
+_LOCK_KEY = 815_204_001
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+def _interval() -> timedelta:
+    if LOG_PARTITION_INTERVAL == "weekly":
+        return timedelta(days=7)
+    if LOG_PARTITION_INTERVAL == "daily":
+        return timedelta(days=1)
+    raise ValueError(f"Unknown log partition interval: {LOG_PARTITION_INTERVAL}")
+
+def _period_start(moment: datetime) -> datetime:
+    start = datetime(moment.year, moment.month, moment.day)
+    if LOG_PARTITION_INTERVAL == "weekly":
+        start -= timedelta(days=start.weekday())
+    return start
+
+def _lock(conn: Connection):
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+
+# Columnas añadidas después de crear la tabla particionada
+_ADDED_COLUMNS = [
+    "duration_ms DOUBLE PRECISION",
+    "db_statements INTEGER",
+    "db_time_ms DOUBLE PRECISION",
+    "db_rows INTEGER",
+    '"requestBodyBlob" BYTEA',
+    '"requestBodyRef" VARCHAR',
+    '"responseBodyBlob" BYTEA',
+    '"responseBodyRef" VARCHAR',
+    '"bodyCodec" VARCHAR',
+]
+
+def prepare_logs_table(bind: Engine = engine):
+    # Una tabla logs previa sin particionar se renombra a logs_legacy para que
+    # create_all cree la nueva tabla particionada con el mismo nombre.
+    with bind.begin() as conn:
+        _lock(conn)
+        relkind = conn.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass('logs')")
+        ).scalar()
+        if relkind == "p":
+            for column in _ADDED_COLUMNS:
+                conn.execute(text(f"ALTER TABLE logs ADD COLUMN IF NOT EXISTS {column}"))
+            return
+        if relkind != "r":
+            return
+
+        conn.execute(text("ALTER TABLE logs RENAME TO logs_legacy"))
+        conn.execute(text("ALTER TABLE logs_legacy RENAME CONSTRAINT logs_pkey TO logs_legacy_pkey"))
+        conn.execute(text("ALTER INDEX IF EXISTS ix_logs_id RENAME TO ix_logs_legacy_id"))
+        conn.execute(text("ALTER SEQUENCE IF EXISTS logs_id_seq RENAME TO logs_legacy_id_seq"))
+
+def _partition_bounds(conn: Connection) -> list[tuple[str, datetime, datetime]]:
+    partitions = conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'logs'::regclass"
+    )).all()
+
+    bounds = []
+    for name, bound in partitions:
+        match = _BOUND_RE.search(bound or "")
+        if match:
+            bounds.append((name, datetime.fromisoformat(match.group(1)), datetime.fromisoformat(match.group(2))))
+    return bounds
+
+def _uncovered(start: datetime, end: datetime, bounds: list[tuple[str, datetime, datetime]]) -> list[tuple[datetime, datetime]]:
+    # Tramos de [start, end) sin partición; al cambiar LOG_PARTITION_INTERVAL las
+    # particiones nuevas solo rellenan huecos y no se solapan con las que ya hay
+    gaps = []
+    for _, lower, upper in sorted(bounds, key=lambda bound: bound[1]):
+        if upper <= start or lower >= end:
+            continue
+        if lower > start:
+            gaps.append((start, lower))
+        start = max(start, upper)
+    if start < end:
+        gaps.append((start, end))
+    return gaps
+
+def ensure_log_partitions(conn: Connection, now: datetime):
+    conn.execute(text("CREATE TABLE IF NOT EXISTS logs_default PARTITION OF logs DEFAULT"))
+
+    bounds = _partition_bounds(conn)
+    step = _interval()
+    start = _period_start(now)
+    for _ in range(LOG_PARTITIONS_AHEAD + 1):
+        end = start + step
+        for lower, upper in _uncovered(start, end, bounds):
+            name = f"logs_p{lower:%Y%m%d}"
+            try:
+                # Un savepoint por partición: si una falla (p. ej. filas de ese rango en
+                # logs_default) las demás se crean igual
+                with conn.begin_nested():
+                    conn.execute(text(
+                        f"CREATE TABLE {name} PARTITION OF logs "
+                        f"FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+                    ))
+                bounds.append((name, lower, upper))
+            except SQLAlchemyError as e:
+                print(f"Log partition {name} could not be created: {e}")
+        start = end
+
+def drop_expired_log_partitions(conn: Connection, now: datetime) -> list[str]:
+    cutoff = now - timedelta(days=LOG_RETENTION_DAYS)
+    dropped = []
+    for name, _, upper in _partition_bounds(conn):
+        if upper <= cutoff:
+            # DROP de la partición completa: sin DELETE, sin bloat ni vacuum
+            conn.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+            dropped.append(name)
+    return dropped
+
+def maintain_log_partitions(bind: Engine = engine):
+    now = datetime.utcnow()
+    with bind.begin() as conn:
+        _lock(conn)
+        ensure_log_partitions(conn, now)
+        dropped = drop_expired_log_partitions(conn, now)
+    if dropped:
+        print(f"Dropped expired log partitions: {', '.join(dropped)}")
+    prune_body_store(LOG_RETENTION_DAYS)
+    prune_profiles()
+
+async def run_log_partition_maintenance():
+    while True:
+        await asyncio.sleep(LOG_PARTITION_MAINTENANCE_INTERVAL)
+        try:
+            await asyncio.to_thread(maintain_log_partitions)
+        except Exception as e:
+            print(f"Log partition maintenance failed: {e}")
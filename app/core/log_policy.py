@@ -0,0 +1,100 @@
+import json
+import os
+import random
+import time
+from fnmatch import fnmatchcase
+from typing import Literal, Optional
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+load_dotenv()
+
+LOG_POLICY_FILE = os.getenv("LOG_POLICY_FILE")
+LOG_POLICY_RELOAD_INTERVAL = float(os.getenv("LOG_POLICY_RELOAD_INTERVAL", "5"))
+
+# Ejemplo de LOG_POLICY_FILE:
+# {
+#   "default": {"sample_rate": 0.01, "status_sample_rates": {"4xx": 1.0, "5xx": 1.0}, "capture": "headers"},
+#   "routes": [
+#     {"match": "GET /api/cv*", "sample_rate": 0.001, "capture": "none"},
+#     {"match": "POST /api/register*", "capture": "full"}
+#   ]
+# }
+
+class LogRule(BaseModel):
+    match: str = "*"
+    sample_rate: float = 1.0
+    # Claves como "404" o "5xx"; el código exacto tiene prioridad sobre la clase
+    status_sample_rates: dict[str, float] = {}
+    # none: solo metadatos, headers: sin bodies, full: headers y bodies
+    capture: Literal["none", "headers", "full"] = "full"
+
+    @property
+    def capture_headers(self) -> bool:
+        return self.capture != "none"
+
+    @property
+    def capture_body(self) -> bool:
+        return self.capture == "full"
+
+    def matches(self, method: str, path: str) -> bool:
+        return fnmatchcase(f"{method} {path}", self.match) or fnmatchcase(path, self.match)
+
+    def rate_for(self, status: int) -> float:
+        code = str(status)
+        if code in self.status_sample_rates:
+            return self.status_sample_rates[code]
+        family = f"{code[0]}xx"
+        if family in self.status_sample_rates:
+            return self.status_sample_rates[family]
+        return self.sample_rate
+
+class LogPolicyConfig(BaseModel):
+    default: LogRule = LogRule()
+    routes: list[LogRule] = []
+
+class LogPolicy:
+    def __init__(self, path: Optional[str] = LOG_POLICY_FILE, reload_interval: float = LOG_POLICY_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.config = LogPolicyConfig()
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._maybe_reload(force=True)
+
+    def _maybe_reload(self, force: bool = False):
+        if not self.path:
+            return
+
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return
+            with open(self.path, encoding="utf-8") as f:
+                self.config = LogPolicyConfig.model_validate(json.load(f))
+            self._mtime = mtime
+        except Exception as e:
+            # Mantenemos la última política válida
+            print(f"Log policy reload failed: {e}")
+
+    def rule_for(self, method: str, path: str) -> LogRule:
+        self._maybe_reload()
+        for rule in self.config.routes:
+            if rule.matches(method, path):
+                return rule
+        return self.config.default
+
+    def should_log(self, rule: LogRule, status: int) -> bool:
+        rate = rule.rate_for(status)
+        if rate >= 1:
+            return True
+        return rate > 0 and random.random() < rate
+
+
+log_policy = LogPolicy()
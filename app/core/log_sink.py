@@ -0,0 +1,141 @@
+import asyncio
+import os
+from dotenv import load_dotenv
+from sqlalchemy import insert
+
+from app.core.database import engine
+from app.core.log_bodies import encode_row
+from app.core.metrics import LOG_SINK_ROWS
+from app.models.logs import Logging
+
+load_dotenv()
+
+LOG_QUEUE_MAX_SIZE = int(os.getenv("LOG_QUEUE_MAX_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "500"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
+# "drop_newest" descarta el registro entrante, "drop_oldest" hace sitio sacando el más antiguo
+LOG_OVERFLOW_POLICY = os.getenv("LOG_OVERFLOW_POLICY", "drop_newest")
+
+_STOP = object()
+_COLUMNS = [c.key for c in Logging.__table__.columns if c.key != "id"]
+
+
+class LogSink:
+    def __init__(
+        self,
+        max_size: int = LOG_QUEUE_MAX_SIZE,
+        batch_size: int = LOG_BATCH_SIZE,
+        flush_interval: float = LOG_FLUSH_INTERVAL,
+        overflow_policy: str = LOG_OVERFLOW_POLICY,
+    ):
+        if overflow_policy not in {"drop_newest", "drop_oldest"}:
+            raise ValueError(f"Unknown log overflow policy: {overflow_policy}")
+
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+        self._closing = False
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    def _count(self, result: str, rows: int = 1):
+        setattr(self, result, getattr(self, result) + rows)
+        LOG_SINK_ROWS.labels(result).inc(rows)
+
+    def submit(self, row: dict) -> bool:
+        if self._queue is None or self._closing:
+            self._count("dropped")
+            return False
+
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.overflow_policy == "drop_oldest":
+            try:
+                self._queue.get_nowait()
+                self._queue.put_nowait(row)
+                self._count("dropped")
+                return True
+            except (asyncio.QueueEmpty, asyncio.QueueFull):
+                pass
+
+        self._count("dropped")
+        return False
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._closing = False
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        # El writer vacía la cola hasta el centinela y hace un último flush
+        self._closing = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch = []
+            item = await self._queue.get()
+            deadline = loop.time() + self.flush_interval
+
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+
+                try:
+                    item = self._queue.get_nowait()
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[dict]):
+        if not batch:
+            return
+        try:
+            await asyncio.to_thread(self._write, batch)
+            self._count("written", len(batch))
+        except Exception as e:
+            self._count("failed", len(batch))
+            print(f"Logging failed: {e}")
+
+    def _write(self, batch: list[dict]):
+        # La compresión de bodies se hace aquí, fuera del event loop
+        rows = [{key: encoded.get(key) for key in _COLUMNS} for encoded in map(encode_row, batch)]
+        # executemany sobre psycopg2 se envía como INSERT multi-fila (insertmanyvalues)
+        with engine.begin() as conn:
+            conn.execute(insert(Logging.__table__), rows)
+
+
+log_sink = LogSink()
@@ -1,121 +1,184 @@
 import json
+import os
+import time
+import zlib
 from datetime import datetime
 from typing import Optional
 
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 import httpx
-from sqlalchemy.orm import Session
 
-from app.models.logs import Logging
-from app.core.database import SessionLocal
-
-def _truncate(s: Optional[str], max_len: int = 8000) -> Optional[str]:
-    if s is None:
-        return None
-    return s if len(s) <= max_len else s[:max_len] + "…(truncated)"
+from app.core.log_policy import log_policy
+from app.core.log_sink import log_sink
+from app.core.metrics import observe_outbound
+from app.core.query_stats import current_query_stats
 
 def _headers_to_json(headers) -> str:
     redacted = {}
     for k, v in dict(headers).items():
         lk = k.lower()
-        if lk in {"authorization", "cookie", "set-cookie"}:
+        if lk in {"authorization", "cookie", "set-cookie", "x-profile-token"}:
             redacted[k] = "***"
         else:
             redacted[k] = v
     return json.dumps(redacted, ensure_ascii=False)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        started_at = datetime.utcnow()
-
-        req_body_bytes = await request.body()
-        req_body = _truncate(req_body_bytes.decode("utf-8", errors="replace"))
-
-        response = await call_next(request)
-
-        resp_body_bytes = b""
-        async for chunk in response.body_iterator:
-            resp_body_bytes += chunk
-
-        resp_body = _truncate(resp_body_bytes.decode("utf-8", errors="replace"))
-
-        new_response = Response(
-            content=resp_body_bytes,
-            status_code=response.status_code,
-            headers=dict(response.headers),
-            media_type=response.media_type,
-        )
+LOG_BODY_MAX_BYTES = int(os.getenv("LOG_BODY_MAX_BYTES", "8000"))
+
+class _BodyCapture:
+    # Copia solo los primeros `limit` bytes; el resto del body pasa sin tocarse
+    def __init__(self, limit: int = LOG_BODY_MAX_BYTES):
+        self.limit = limit
+        self.buffer = bytearray()
+        self.truncated = False
+
+    def feed(self, chunk: bytes):
+        room = self.limit - len(self.buffer)
+        if room > 0:
+            self.buffer += chunk[:room]
+        if len(chunk) > room:
+            self.truncated = True
+
+    def text(self, content_encoding: Optional[str] = None) -> str:
+        data = bytes(self.buffer)
+        if content_encoding in {"gzip", "deflate"}:
+            try:
+                # wbits=47 detecta gzip o zlib; un prefijo truncado se descomprime parcialmente
+                data = zlib.decompressobj(47).decompress(data, self.limit)
+            except zlib.error:
+                return f"<{len(data)} bytes {content_encoding}>"
+        elif content_encoding and content_encoding != "identity":
+            return f"<{len(data)} bytes {content_encoding}>"
+
+        text = data.decode("utf-8", errors="replace")
+        return text + "…(truncated)" if self.truncated else text
+
+class LoggingMiddleware:
+    def __init__(self, app: ASGIApp, max_body: int = LOG_BODY_MAX_BYTES):
+        self.app = app
+        self.max_body = max_body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        db: Session = SessionLocal()
+        started_at = datetime.utcnow()
+        started_perf = time.perf_counter()
+        request = Request(scope)
+        rule = log_policy.rule_for(request.method, request.url.path)
+        req_body = _BodyCapture(self.max_body)
+        resp_body = _BodyCapture(self.max_body)
+        response_start = {}
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "http.request" and rule.capture_body:
+                req_body.feed(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                response_start.update(message)
+            elif message["type"] == "http.response.body" and rule.capture_body:
+                resp_body.feed(message.get("body", b""))
+            await send(message)
 
         try:
-            log_entry = Logging(
-                level="INFO",
-                operation=f"{request.method} {request.url.path}",
-                message="Inbound HTTP request",
-                http_method=request.method,
-                http_url=str(request.url),
-                requestHeaders=_headers_to_json(request.headers),
-                requestBody=req_body,
-                requestStatus=response.status_code,
-                responseHeaders=_headers_to_json(response.headers),
-                responseBody=resp_body,
-                requestTime=started_at,
-            )
-            db.add(log_entry)
-            db.commit()
-        except Exception as e:
-            db.rollback()
-            print(f"Logging failed: {e}")
+            await self.app(scope, receive_wrapper, send_wrapper)
         finally:
-            db.close()
-        
-        return new_response
-
+            status_code = response_start.get("status", 500)
+            if log_policy.should_log(rule, status_code):
+                stats = current_query_stats()
+                log_sink.submit({
+                    "level": "INFO",
+                    "operation": f"{request.method} {request.url.path}",
+                    "message": "Inbound HTTP request",
+                    "http_method": request.method,
+                    "http_url": str(request.url),
+                    "requestHeaders": _headers_to_json(request.headers) if rule.capture_headers else None,
+                    "requestBody": req_body.text() if rule.capture_body else None,
+                    "requestStatus": status_code,
+                    "responseHeaders": _headers_to_json(Headers(raw=response_start.get("headers", []))) if rule.capture_headers else None,
+                    "responseBody": resp_body.text() if rule.capture_body else None,
+                    "requestTime": started_at,
+                    "duration_ms": (time.perf_counter() - started_perf) * 1000,
+                    "db_statements": stats.statements if stats else None,
+                    "db_time_ms": stats.db_time_ms if stats else None,
+                    "db_rows": stats.rows if stats else None,
+                    "created_at": datetime.utcnow(),
+                })
+
+
+class _CapturedStream(httpx.AsyncByteStream):
+    # Envuelve el stream de la respuesta: copia los primeros bytes mientras el
+    # llamador lo consume y emite el log al cerrarse, sin leer el body por su cuenta
+    def __init__(self, stream: httpx.AsyncByteStream, capture: _BodyCapture, on_close):
+        self._stream = stream
+        self._capture = capture
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._capture.feed(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close()
 
-def outboundLogging(db: Session, operation: str = "Outbound request"):
+def outboundLogging(operation: str = "Outbound request", max_body: int = LOG_BODY_MAX_BYTES):
     async def on_request(request: httpx.Request):
         request.extensions["started_at"] = datetime.utcnow()
+        request.extensions["started_perf"] = time.perf_counter()
 
         # Guardamos el request en extensions para usarlo en on_response
         request.extensions["logged_headers"] = _headers_to_json(request.headers)
-        if request.content:
-            body = request.content.decode("utf-8", errors="replace") if isinstance(request.content, (bytes, bytearray)) else str(request.content)
-            request.extensions["logged_body"] = _truncate(body)
+        try:
+            content = request.content
+        except httpx.RequestNotRead:
+            content = None
+
+        if content:
+            body = _BodyCapture(max_body)
+            body.feed(content)
+            request.extensions["logged_body"] = body.text()
         else:
             request.extensions["logged_body"] = None
 
     async def on_response(response: httpx.Response):
-        started_at = response.request.extensions.get("started_at")
-        req_headers = response.request.extensions.get("logged_headers")
-        req_body = response.request.extensions.get("logged_body")
-
-        resp_text = None
-        try:
-            # Nota: leer text aquí puede cargar todo en memoria; truncamos
-            resp_text = _truncate(response.text)
-        except Exception:
-            resp_text = None
-
-        log_entry = Logging(
-            level="INFO" if response.status_code < 400 else "ERROR",
-            operation=operation,
-            message="Outbound request",
-            http_method=response.request.method,
-            http_url=str(response.request.url),
-            requestHeaders=req_headers,
-            requestBody=req_body,
-            requestStatus=response.status_code,
-            responseHeaders=_headers_to_json(response.headers),
-            responseBody=resp_text,
-            requestTime=started_at,
-        )
-        db.add(log_entry)
-        db.commit()
+        request = response.request
+        capture = _BodyCapture(max_body)
+
+        def on_close():
+            elapsed_ms = (time.perf_counter() - request.extensions["started_perf"]) * 1000
+            observe_outbound(operation, request.url.host, response.status_code, elapsed_ms / 1000)
+            log_sink.submit({
+                "level": "INFO" if response.status_code < 400 else "ERROR",
+                "operation": operation,
+                "message": "Outbound request",
+                "http_method": request.method,
+                "http_url": str(request.url),
+                "requestHeaders": request.extensions.get("logged_headers"),
+                "requestBody": request.extensions.get("logged_body"),
+                "requestStatus": response.status_code,
+                "responseHeaders": _headers_to_json(response.headers),
+                "responseBody": capture.text(response.headers.get("content-encoding")),
+                "requestTime": request.extensions.get("started_at"),
+                "duration_ms": elapsed_ms,
+                "created_at": datetime.utcnow(),
+            })
+
+        response.stream = _CapturedStream(response.stream, capture, on_close)
 
     return httpx.AsyncClient(
         event_hooks={"request": [on_request], "response": [on_response]},
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,186 @@
+import os
+import time
+from dotenv import load_dotenv
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.query_stats import SERVER_TIMING_ENABLED, begin_query_stats
+
+load_dotenv()
+
+# Con varios workers de uvicorn cada proceso escribe sus métricas en este directorio
+# y /metrics las agrega; debe existir y vaciarse antes de arrancar los workers.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Inbound HTTP request duration",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Inbound HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+OUTBOUND_DURATION = Histogram(
+    "http_outbound_request_duration_seconds",
+    "Outbound HTTP request duration",
+    ["operation", "host", "status"],
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "SQL statements executed per inbound request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL statements per inbound request",
+    ["method", "route"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "In-process cache lookups",
+    ["cache", "result"],
+)
+LOG_SINK_ROWS = Counter(
+    "log_sink_rows_total",
+    "Request log rows by outcome: written, dropped (queue full or closed) or failed (batch insert error)",
+    ["result"],
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total",
+    "Connections checked out from the SQLAlchemy pool",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out from the SQLAlchemy pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTIONS_CREATED = Counter(
+    "db_pool_connections_created_total",
+    "New DBAPI connections opened by the SQLAlchemy pool",
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the SQLAlchemy pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after pool_timeout",
+    ["pool"],
+)
+DB_POOL_SATURATION = Gauge(
+    "db_pool_saturation_ratio",
+    "Checked out connections over pool_size + max_overflow",
+    ["pool"],
+    multiprocess_mode="livemax",
+)
+
+class InstrumentedQueuePool(QueuePool):
+    metrics_label = "sync"
+
+    # _do_get incluye la espera en la cola y, si hay overflow, la apertura de la conexión
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_label).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.metrics_label).observe(time.perf_counter() - started)
+        self._observe_saturation()
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._observe_saturation()
+
+    def _observe_saturation(self):
+        # Con max_overflow=-1 el pool no tiene tope; se mide contra pool_size
+        capacity = self.size() + max(self._max_overflow, 0)
+        DB_POOL_SATURATION.labels(self.metrics_label).set(self.checkedout() / capacity if capacity else 0)
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+def instrument_pool(engine: Engine):
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS_CREATED.inc()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc()
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+def observe_outbound(operation: str, host: str, status: int | str, seconds: float):
+    OUTBOUND_DURATION.labels(operation, host, str(status)).observe(seconds)
+
+def metrics_response() -> Response:
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+def mark_process_dead():
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+        started = time.perf_counter()
+        stats = begin_query_stats()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            # Plantilla de la ruta (p. ej. /api/cv/experience) para no disparar la cardinalidad
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            REQUEST_DURATION.labels(method, route_path, str(status["code"])).observe(time.perf_counter() - started)
+            REQUEST_DB_STATEMENTS.labels(method, route_path).observe(stats.statements)
+            REQUEST_DB_DURATION.labels(method, route_path).observe(stats.db_time)
@@ -0,0 +1,161 @@
+import asyncio
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import Header, HTTPException, status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+load_dotenv()
+
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "/tmp/cv_back/profiles"))
+# Los perfiles se borran en el mantenimiento de logs: los de más de PROFILE_RETENTION_HOURS
+# y, de los restantes, los más antiguos por encima de PROFILE_MAX_FILES
+PROFILE_RETENTION_HOURS = float(os.getenv("PROFILE_RETENTION_HOURS", "24"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "500"))
+
+PROFILING_ENABLED = bool(PROFILE_ADMIN_TOKEN) or PROFILE_SAMPLE_RATE > 0
+
+_PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+def _is_admin_token(token: Optional[str]) -> bool:
+    return bool(PROFILE_ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, PROFILE_ADMIN_TOKEN)
+
+def profile_admin_guard(x_profile_token: Optional[str] = Header(default=None)):
+    if not _is_admin_token(x_profile_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    if not _PROFILE_ID_RE.match(profile_id):
+        return None
+    path = PROFILE_DIR / f"{profile_id}.folded"
+    return path if path.exists() else None
+
+# Hilos que ejecutan trabajo de los requests: el threadpool de FastAPI/anyio y el pool de bcrypt
+_REQUEST_THREAD_PREFIXES = ("AnyIO worker thread", "password-hash")
+
+# Un solo request perfilado a la vez por worker: así el trabajo en el threadpool de las
+# muestras es, salvo requests concurrentes sin perfilar, el de ese request
+_profile_lock = threading.Lock()
+
+def prune_profiles() -> int:
+    if not PROFILE_DIR.exists():
+        return 0
+
+    profiles = []
+    for path in PROFILE_DIR.glob("*.folded"):
+        try:
+            profiles.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            pass
+    profiles.sort(reverse=True)
+
+    cutoff = time.time() - PROFILE_RETENTION_HOURS * 3600
+    removed = 0
+    for position, (mtime, path) in enumerate(profiles):
+        if mtime < cutoff or position >= PROFILE_MAX_FILES:
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+class _StackSampler(threading.Thread):
+    # Muestrea las pilas del request y las acumula en formato "collapsed" de
+    # flamegraph.pl / speedscope. En el hilo del event loop solo cuentan las pilas que
+    # pasan por el frame del middleware de ese request (su corrutina está corriendo);
+    # el resto de requests, el writer del log sink y las tareas de fondo se descartan.
+    def __init__(self, interval: float, request_frame, loop_thread: int):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.request_frame = request_frame
+        self.loop_thread = loop_thread
+        self.counts: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+
+    def _wanted(self, thread_id: int, frame, names: dict) -> bool:
+        if thread_id == self.loop_thread:
+            while frame is not None:
+                if frame is self.request_frame:
+                    return True
+                frame = frame.f_back
+            return False
+        return names.get(thread_id, "").startswith(_REQUEST_THREAD_PREFIXES)
+
+    def run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                if not self._wanted(thread_id, frame, names):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self) -> str:
+        self._stop_event.set()
+        self.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.items())
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            return True
+        return _is_admin_token(Headers(scope=scope).get("x-profile-token"))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self._should_profile(scope) or not _profile_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            _profile_lock.release()
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send):
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        # El frame de esta corrutina sigue en la pila del event loop mientras corre el request
+        sampler = _StackSampler(PROFILE_INTERVAL, sys._getframe(), threading.get_ident())
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # join espera hasta un intervalo de muestreo; fuera del event loop
+            folded = await asyncio.to_thread(sampler.stop)
+            try:
+                PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+                (PROFILE_DIR / f"{profile_id}.folded").write_text(folded, encoding="utf-8")
+            except OSError as e:
+                print(f"Profile write failed: {e}")
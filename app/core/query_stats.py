@@ -0,0 +1,67 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+
+class QueryStats:
+    __slots__ = ("statements", "db_time", "rows")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        # None si algún SELECT no informó de sus filas (rowcount -1 según driver y tipo de cursor)
+        self.rows: Optional[int] = 0
+
+    @property
+    def db_time_ms(self) -> float:
+        return self.db_time * 1000
+
+    def server_timing(self) -> str:
+        rows = "unknown" if self.rows is None else self.rows
+        return f'db;dur={self.db_time_ms:.1f};desc="{self.statements} queries, {rows} rows"'
+
+# El threadpool de FastAPI copia el contexto, así que los endpoints síncronos
+# acumulan sobre el mismo objeto que creó el middleware.
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def begin_query_stats() -> QueryStats:
+    stats = QueryStats()
+    _current.set(stats)
+    return stats
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+def instrument_queries(engine: Engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        stats = _current.get()
+        if stats is None:
+            return
+        stats.statements += 1
+        stats.db_time += time.perf_counter() - started
+        if cursor.description is None or stats.rows is None:
+            return
+        if cursor.rowcount < 0:
+            stats.rows = None
+        else:
+            stats.rows += cursor.rowcount
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
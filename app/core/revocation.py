@@ -0,0 +1,70 @@
+import asyncio
+import calendar
+import os
+import random
+from datetime import datetime
+from dotenv import load_dotenv
+
+from app.core.database import SessionLocal
+from app.models.user import RevokedToken
+
+load_dotenv()
+
+AUTH_REVOCATION_REFRESH_INTERVAL = float(os.getenv("AUTH_REVOCATION_REFRESH_INTERVAL", "30"))
+
+class RevocationList:
+    # Copia en memoria de revoked_token; se sustituye entera en cada refresco
+    # para que las lecturas desde los requests no necesiten lock.
+    def __init__(self):
+        self._jtis: frozenset[str] = frozenset()
+        self._users: dict[int, float] = {}
+
+    def add_jti(self, jti: str):
+        self._jtis = self._jtis | {jti}
+
+    def is_revoked(self, payload: dict) -> bool:
+        jti = payload.get("jti")
+        if jti is not None and jti in self._jtis:
+            return True
+
+        try:
+            revoked_at = self._users.get(int(payload.get("sub")))
+        except (TypeError, ValueError):
+            return False
+        if revoked_at is None:
+            return False
+        issued_at = payload.get("iat")
+        return issued_at is None or issued_at <= revoked_at
+
+    def refresh(self):
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(RevokedToken.jti, RevokedToken.user_id, RevokedToken.revoked_at)
+                .filter(RevokedToken.expires_at > datetime.utcnow())
+                .all()
+            )
+        finally:
+            db.close()
+
+        jtis = set()
+        users: dict[int, float] = {}
+        for jti, user_id, revoked_at in rows:
+            if jti is not None:
+                jtis.add(jti)
+            elif user_id is not None:
+                timestamp = calendar.timegm(revoked_at.utctimetuple())
+                users[user_id] = max(users.get(user_id, 0), timestamp)
+
+        self._jtis = frozenset(jtis)
+        self._users = users
+
+revocation_list = RevocationList()
+
+async def run_revocation_refresh():
+    while True:
+        try:
+            await asyncio.to_thread(revocation_list.refresh)
+        except Exception as e:
+            print(f"Revocation list refresh failed: {e}")
+        await asyncio.sleep(AUTH_REVOCATION_REFRESH_INTERVAL * random.uniform(0.9, 1.1))
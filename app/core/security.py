@@ -1,12 +1,27 @@
+import asyncio
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from jose import jwt
 from datetime import datetime, timedelta
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from app.core.vault import *
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt libera el GIL, así que un pool de hilos da paralelismo real sin bloquear el event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING)
+
 JWT_SECRET_KEY = get_jwt_secret_key()
 
+ACCESS_TOKEN_TTL = timedelta(minutes=60)
+
 PRIVATE_KEY = get_JWT_private_key()
 ISSUER = get_JWT_issuer()
 AUDIENCE = get_JWT_audience()
@@ -17,10 +32,29 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+async def _run_in_hash_pool(fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_slots.release()
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_pool(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
 def create_access_token(payload: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = payload.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=60))
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    expire = now + (expires_delta or ACCESS_TOKEN_TTL)
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm='HS256')
     return encoded_jwt
 
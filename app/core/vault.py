@@ -1,6 +1,10 @@
+import asyncio
 import os
+import random
+import threading
 import hvac
 from dotenv import load_dotenv
+from app.core.metrics import CACHE_REQUESTS
 
 load_dotenv()
 
@@ -9,24 +13,97 @@ VAULT_TOKEN = os.getenv("VAULT_TOKEN")
 VAULT_KV_MOUNT=os.getenv("VAULT_KV_MOUNT")
 VAULT_JWT_CV_BACK_PATH=os.getenv("VAULT_JWT_CV_BACK_PATH")
 VAULT_CV_BACK_PATH=os.getenv("VAULT_CV_BACK_PATH")
+VAULT_REFRESH_INTERVAL = float(os.getenv("VAULT_REFRESH_INTERVAL", "300"))
+VAULT_RETRY_INTERVAL = float(os.getenv("VAULT_RETRY_INTERVAL", "15"))
+
+# Un cliente compartido por proceso. Los requests solo leen _snapshot; la red
+# solo se toca en la carga inicial (import) y en run_vault_refresh.
+_shared_client: hvac.Client | None = None
+_client_lock = threading.Lock()
+_kv_lock = threading.Lock()
+_snapshot: dict[tuple[str, str], dict] = {}
+_leases: dict[tuple[str, str], tuple[str, int]] = {}
 
 def _client() -> hvac.Client:
+    global _shared_client
+    if _shared_client is not None:
+        return _shared_client
+
     if not VAULT_URL or not VAULT_TOKEN:
         raise ValueError("Vault URL or Token not set in environment variables.")
-    
-    client = hvac.Client(url=VAULT_URL, token=VAULT_TOKEN)
-    if not client.is_authenticated():
-        raise ConnectionError("Failed to authenticate with Vault.")
-    
-    return client
 
-def _get_KV(mount: str, path: str):
-    client = _client()
-    read_response = client.secrets.kv.v2.read_secret_version(
+    with _client_lock:
+        if _shared_client is None:
+            client = hvac.Client(url=VAULT_URL, token=VAULT_TOKEN)
+            if not client.is_authenticated():
+                raise ConnectionError("Failed to authenticate with Vault.")
+            _shared_client = client
+
+    return _shared_client
+
+def _read_KV(key: tuple[str, str]) -> dict:
+    mount, path = key
+    read_response = _client().secrets.kv.v2.read_secret_version(
         mount_point=mount,
         path=path
     )
-    return read_response['data']['data']
+    if read_response.get("renewable") and read_response.get("lease_id"):
+        _leases[key] = (read_response["lease_id"], read_response.get("lease_duration") or 0)
+    # Se sustituye la entrada entera; los lectores ven la versión vieja o la nueva
+    data = read_response['data']['data']
+    _snapshot[key] = data
+    return data
+
+def _get_KV(mount: str, path: str):
+    key = (mount, path)
+    data = _snapshot.get(key)
+    if data is not None:
+        CACHE_REQUESTS.labels("vault", "hit").inc()
+        return data
+    CACHE_REQUESTS.labels("vault", "miss").inc()
+    # Solo la primera lectura de cada ruta va a Vault; ocurre al importar los módulos
+    with _kv_lock:
+        data = _snapshot.get(key)
+        if data is None:
+            data = _read_KV(key)
+    return data
+
+def _renew_token():
+    client = _client()
+    token = client.auth.token.lookup_self()["data"]
+    ttl = token.get("ttl") or 0
+    if token.get("renewable") and ttl < 2 * VAULT_REFRESH_INTERVAL:
+        client.auth.token.renew_self()
+
+def _renew_leases():
+    for lease_id, _ in list(_leases.values()):
+        _client().sys.renew_lease(lease_id=lease_id)
+
+def _refresh_interval() -> float:
+    # Con leases de Vault se refresca antes de que caduque el más corto
+    interval = VAULT_REFRESH_INTERVAL
+    for _, duration in _leases.values():
+        if duration > 0:
+            interval = min(interval, duration / 2)
+    return interval
+
+def refresh_secrets():
+    _renew_token()
+    _renew_leases()
+    for key in list(_snapshot):
+        _read_KV(key)
+
+async def run_vault_refresh():
+    interval = _refresh_interval()
+    while True:
+        await asyncio.sleep(interval * random.uniform(0.8, 1.2))
+        try:
+            await asyncio.to_thread(refresh_secrets)
+            interval = _refresh_interval()
+        except Exception as e:
+            # Se siguen sirviendo los secretos anteriores y se reintenta antes
+            print(f"Vault refresh failed, serving cached secrets: {e}")
+            interval = min(VAULT_RETRY_INTERVAL, _refresh_interval())
 
 # JWT Secrets
 def _get_JWT_secret():
@@ -1,8 +1,48 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.api import api_router
+from app.core.cache_listener import run_cache_listener
+from app.core.database import DB_ASYNC, async_engine, prewarm_async_pool, prewarm_pool
 from app.core.logging import LoggingMiddleware
+from app.core.log_sink import log_sink
+from app.core.log_partitions import run_log_partition_maintenance
+from app.core.metrics import MetricsMiddleware, mark_process_dead, metrics_response
+from app.core.profiling import PROFILING_ENABLED, ProfilingMiddleware
+from app.core.revocation import run_revocation_refresh
+from app.core.vault import run_vault_refresh
 
-app = FastAPI(title="CV Back API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await asyncio.to_thread(prewarm_pool)
+        if DB_ASYNC:
+            await prewarm_async_pool()
+    except Exception as e:
+        print(f"Connection pool pre-warm failed: {e}")
+    await log_sink.start()
+    partition_task = asyncio.create_task(run_log_partition_maintenance())
+    revocation_task = asyncio.create_task(run_revocation_refresh())
+    vault_task = asyncio.create_task(run_vault_refresh())
+    cache_listener_task = asyncio.create_task(run_cache_listener())
+    yield
+    cache_listener_task.cancel()
+    vault_task.cancel()
+    revocation_task.cancel()
+    partition_task.cancel()
+    await log_sink.stop()
+    await async_engine.dispose()
+    mark_process_dead()
+
+app = FastAPI(title="CV Back API", version="1.0.0", lifespan=lifespan)
 app.add_middleware(LoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Sin token ni muestreo configurados el middleware ni siquiera se monta
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+app.include_router(api_router, prefix="/api")
 
-app.include_router(api_router, prefix="/api")
\ No newline at end of file
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
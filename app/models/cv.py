@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, DateTime, Index, Integer, String, Boolean, ForeignKey, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -24,11 +25,21 @@ class Cv_social_network(Base):
     network_name = Column(String, nullable=False)
     profile_link = Column(String, nullable=False)
 
-    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id"), index=True, nullable=False)
     user = relationship("User", back_populates="cv_social_networks")
 
 class Cv_education(Base):
     __tablename__ = "cv_education"
+    # Mismas columnas que la comprobación de duplicados de set_cv_education; con NULLS NOT
+    # DISTINCT dos fechas vacías cuentan como iguales, igual que el IS NULL de la consulta
+    __table_args__ = (
+        Index(
+            "uq_cv_education_entry",
+            "user_id", "institution", "degree", "start_date", "end_date",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     institution = Column(String, nullable=False)
@@ -39,11 +50,19 @@ class Cv_education(Base):
     location = Column(String, nullable=True)
     summary = Column(String, nullable=True)
 
-    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id"), index=True, nullable=False)
     user = relationship("User", back_populates="cv_education")
 
 class Cv_experience(Base):
     __tablename__ = "cv_experience"
+    __table_args__ = (
+        Index(
+            "uq_cv_experience_entry",
+            "user_id", "workplace", "position", "start_date", "end_date",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     workplace = Column(String, nullable=False)
@@ -53,7 +72,7 @@ class Cv_experience(Base):
     location = Column(String, nullable=True)
     summary = Column(String, nullable=True)
 
-    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id"), index=True, nullable=False)
     user = relationship("User", back_populates="cv_experience")
 
     responsibilities = relationship(
@@ -71,7 +90,7 @@ class Cv_experience_responsibilities(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     responsibility = Column(String, nullable=False)
     
-    experience_id = Column(Integer, ForeignKey("cv_experience.id"), nullable=False)
+    experience_id = Column(Integer, ForeignKey("cv_experience.id"), index=True, nullable=False)
     experience = relationship("Cv_experience", back_populates="responsibilities")
 
 class Cv_experience_achievements(Base):
@@ -80,11 +99,20 @@ class Cv_experience_achievements(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     achievement = Column(String, nullable=False)
 
-    experience_id = Column(Integer, ForeignKey("cv_experience.id"), nullable=False)
+    experience_id = Column(Integer, ForeignKey("cv_experience.id"), index=True, nullable=False)
     experience = relationship("Cv_experience", back_populates="achievements")
 
 class Cv_project(Base):
     __tablename__ = "cv_project"
+    # description es texto libre: se indexa su md5 para no pasar del tamaño máximo de entrada del btree
+    __table_args__ = (
+        Index(
+            "uq_cv_project_entry",
+            "user_id", "name", "start_date", "end_date", text("md5(description)"),
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String, nullable=False)
@@ -93,7 +121,7 @@ class Cv_project(Base):
     description = Column(String, nullable=True)
     location = Column(String, nullable=True)
 
-    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id"), index=True, nullable=False)
     user = relationship("User", back_populates="cv_project")
 
     achievements = relationship("Cv_project_achievements", back_populates="cv_project")
@@ -104,16 +132,33 @@ class Cv_project_achievements(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     achievement = Column(String, nullable=False)
 
-    project_id = Column(Integer, ForeignKey("cv_project.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("cv_project.id"), index=True, nullable=False)
     cv_project = relationship("Cv_project", back_populates="achievements")
 
 
 class Cv_skill(Base):
     __tablename__ = "cv_skill"
+    __table_args__ = (
+        Index(
+            "uq_cv_skill_entry",
+            "user_id", "label", text("md5(detail)"),
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     label = Column(String, nullable=False)
     detail = Column(String, nullable=True)
 
-    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
-    user = relationship("User", back_populates="cv_skill")
\ No newline at end of file
+    user_id = Column(Integer, ForeignKey("user.id"), index=True, nullable=False)
+    user = relationship("User", back_populates="cv_skill")
+
+class Cv_document(Base):
+    __tablename__ = "cv_document"
+
+    # Copia desnormalizada de GET /api/cv; la reescriben los set_/patch_ de cv_services en su misma transacción
+    user_id = Column(Integer, ForeignKey("user.id"), primary_key=True)
+    document = Column(JSONB, nullable=True)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -1,11 +1,18 @@
-from sqlalchemy import Column, DateTime, Integer, String, Boolean, ForeignKey, func
+from sqlalchemy import Column, DateTime, Float, Index, Integer, LargeBinary, String, Boolean, ForeignKey, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.core.log_bodies import decode_body
 
 class Logging(Base):
     __tablename__ = "logs"
+    # Particionada por rango de created_at; ver app/core/log_partitions.py
+    __table_args__ = (
+        Index("ix_logs_operation_created_at", "operation", "created_at"),
+        Index("ix_logs_requestStatus_created_at", "requestStatus", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     level = Column(String, nullable=False)
     operation = Column(String, nullable=False)
     message = Column(String, nullable=False)
@@ -13,8 +20,25 @@ class Logging(Base):
     http_url = Column(String, nullable=True)
     requestHeaders = Column(String, nullable=True)
     requestBody = Column(String, nullable=True)
+    requestBodyBlob = Column(LargeBinary, nullable=True)
+    requestBodyRef = Column(String, nullable=True)
     requestStatus = Column(Integer, nullable=True)
     responseHeaders = Column(String, nullable=True)
     responseBody = Column(String, nullable=True)
+    responseBodyBlob = Column(LargeBinary, nullable=True)
+    responseBodyRef = Column(String, nullable=True)
+    bodyCodec = Column(String, nullable=True)
     requestTime = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, nullable=False, server_default=func.now())
\ No newline at end of file
+    duration_ms = Column(Float, nullable=True)
+    db_statements = Column(Integer, nullable=True)
+    db_time_ms = Column(Float, nullable=True)
+    db_rows = Column(Integer, nullable=True)
+    created_at = Column(DateTime, primary_key=True, nullable=False, server_default=func.now())
+
+    @property
+    def request_body(self):
+        return decode_body(self.requestBody, self.requestBodyBlob, self.requestBodyRef, self.bodyCodec)
+
+    @property
+    def response_body(self):
+        return decode_body(self.responseBody, self.responseBodyBlob, self.responseBodyRef, self.bodyCodec)
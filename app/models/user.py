@@ -43,4 +43,14 @@ class TwoFA(Base):
     user_id = Column(Integer, ForeignKey("registered_user.id"), nullable=False, unique=True)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
 
-    user = relationship("RegisteredUser", back_populates="two_fa", uselist=False)
\ No newline at end of file
+    user = relationship("RegisteredUser", back_populates="two_fa", uselist=False)
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_token"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    # Con jti se revoca un token concreto; sin jti, todos los emitidos al usuario antes de revoked_at
+    jti = Column(String, unique=True, index=True, nullable=True)
+    user_id = Column(Integer, ForeignKey("user.id"), index=True, nullable=True)
+    revoked_at = Column(DateTime, nullable=False, server_default=func.now())
+    expires_at = Column(DateTime, index=True, nullable=False)
\ No newline at end of file
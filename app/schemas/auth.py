@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, ConfigDict, EmailStr
 
 class AuthLogin(BaseModel):
@@ -6,4 +7,11 @@ class AuthLogin(BaseModel):
 
 class AuthResponse(BaseModel):
     access_token: str
-    message: str
\ No newline at end of file
+    message: str
+
+# Usuario autenticado construido solo con los claims del token (AUTH_STATELESS)
+class Principal(BaseModel):
+    id: int
+    email: Optional[str] = None
+    firstname: Optional[str] = None
+    lastname: Optional[str] = None
\ No newline at end of file
@@ -1,24 +1,52 @@
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.security import create_access_token, verify_password
-from app.models.user import User
+from app.core.database import run_in_session
+from app.core.revocation import revocation_list
+from app.core.security import create_access_token, verify_password_async
+from app.models.user import RevokedToken
 from app.schemas.auth import AuthLogin
+from app.services.user_service import get_user_service_by_email
 
-def login(db: Session, auth: AuthLogin):
-    user = db.query(User).filter(User.email == auth.email).first()
+async def login(db: Session | AsyncSession, auth: AuthLogin):
+    user = await run_in_session(db, get_user_service_by_email, auth.email)
 
     print("User fetched for login:", user)
 
     if not user:
         return None
     
-    verified = verify_password(auth.password, user.password)
+    verified = await verify_password_async(auth.password, user.password)
     if not verified:
         return None
     
     try:
-        payload = { "sub": str(user.id), "email": user.email }
+        payload = {
+            "sub": str(user.id),
+            "email": user.email,
+            "firstname": user.firstname,
+            "lastname": user.lastname,
+        }
         token = create_access_token(payload)
         return {"access_token": token, "message": "Login successful"}
     except Exception as e:
         return None
 
+def logout(db: Session, claims: dict):
+    jti = claims.get("jti")
+    if jti is None:
+        return {"message": "Logout successful"}
+
+    db.add(RevokedToken(
+        jti=jti,
+        user_id=int(claims["sub"]),
+        revoked_at=datetime.utcnow(),
+        expires_at=datetime.utcfromtimestamp(claims["exp"]),
+    ))
+    db.commit()
+    # Los demás workers lo verán en su próximo refresco de la lista
+    revocation_list.add_jti(jti)
+    return {"message": "Logout successful"}
+
+async def logout_async(db: Session | AsyncSession, claims: dict):
+    return await run_in_session(db, logout, claims)
@@ -1,36 +1,55 @@
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
 from fastapi import HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy.exc import SQLAlchemyError
+from pydantic import TypeAdapter
+from sqlalchemy import Connection, event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, object_session, selectinload
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from app.core.cache import TTLCache, invalidate_after_commit
+from app.core.database import run_in_session
+from app.core.metrics import CACHE_REQUESTS
 from app.models.cv import *
 from app.models.user import User
 from app.schemas.cv import *
 
+load_dotenv()
+
+# Con CV_DOCUMENT_READS, GET /api/cv lee la fila de cv_document por clave primaria.
+# Desactivado por defecto como CV_JSON_FROM_DB; si están los dos, gana CV_DOCUMENT_READS
+CV_DOCUMENT_READS = os.getenv("CV_DOCUMENT_READS", "false").lower() == "true"
+# Con CV_JSON_FROM_DB, GET /api/cv devuelve el JSON que arma Postgres sin pasar por el ORM ni Pydantic
+CV_JSON_FROM_DB = os.getenv("CV_JSON_FROM_DB", "false").lower() == "true"
+
+CV_CACHE_ENABLED = os.getenv("CV_CACHE_ENABLED", "true").lower() == "true"
+CV_CACHE_TTL = float(os.getenv("CV_CACHE_TTL", "60"))
+CV_CACHE_MAX_USERS = int(os.getenv("CV_CACHE_MAX_USERS", "10000"))
+
+# Una entrada por usuario con sus secciones ya validadas (o los bytes del documento):
+# {(sección, *args): respuesta}. Cualquier escritura del usuario la invalida entera.
+cv_cache = TTLCache("cv_user", max_entries=CV_CACHE_MAX_USERS if CV_CACHE_ENABLED else 0, ttl=CV_CACHE_TTL)
+
 # Service functions for CV
 def get_cv(db: Session, user_id: int):
     try:
-        user = db.query(User).filter(User.id == user_id).first()
-        personal_info = db.query(Cv_personal_info).filter(Cv_personal_info.user_id == user_id).first()
-        education = db.query(Cv_education).filter(Cv_education.user_id == user_id).all()
-        experience = (
-            db.query(Cv_experience)
+        # Un SELECT por colección con selectinload: el número de queries no depende del tamaño
+        # del CV y no hay producto cartesiano entre responsabilidades y logros
+        user = (
+            db.query(User)
             .options(
-                joinedload(Cv_experience.responsibilities),  
-                joinedload(Cv_experience.achievements),      
+                joinedload(User.cv_personal_info),
+                selectinload(User.cv_education),
+                selectinload(User.cv_experience).selectinload(Cv_experience.responsibilities),
+                selectinload(User.cv_experience).selectinload(Cv_experience.achievements),
+                selectinload(User.cv_project).selectinload(Cv_project.achievements),
+                selectinload(User.cv_skill),
             )
-            .filter(Cv_experience.user_id == user_id)
-            .all() 
-        )
-        project = (
-            db.query(Cv_project)
-            .options(
-                joinedload(Cv_project.achievements),      
-            )
-            .filter(Cv_project.user_id == user_id)
-            .all() 
+            .filter(User.id == user_id)
+            .first()
         )
-        skills = db.query(Cv_skill).filter(Cv_skill.user_id == user_id).all()
 
-        if not personal_info:
+        if not user or not user.cv_personal_info:
             raise HTTPException(status_code=404, detail="CV not found")
 
         basic_info = BasicInfoResponse(
@@ -41,11 +60,11 @@ def get_cv(db: Session, user_id: int):
 
         cv_data = CvResponse(
             basic_info=basic_info,
-            personal_info=personal_info,
-            education=education,
-            experience=experience,
-            projects=project,
-            skills=skills
+            personal_info=user.cv_personal_info,
+            education=user.cv_education,
+            experience=user.cv_experience,
+            projects=user.cv_project,
+            skills=user.cv_skill
         )
 
         return cv_data
@@ -57,6 +76,212 @@ def get_cv(db: Session, user_id: int):
         print(e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Mismo documento que CvResponse (claves en el mismo orden) armado en una sola query.
+# Las colecciones van en subconsultas correlacionadas, así que no hay producto cartesiano.
+CV_JSON_SQL = """
+SELECT json_build_object(
+    'basic_info', json_build_object(
+        'email', u.email,
+        'first_name', u.firstname,
+        'last_name', u.lastname
+    ),
+    'personal_info', json_build_object(
+        'localization', p.localization,
+        'about_me', p.about_me,
+        'aspiration', p.aspiration,
+        'interests', p.interests,
+        'phone', p.phone,
+        'photo', p.photo,
+        'website', p.website
+    ),
+    'education', coalesce((
+        SELECT json_agg(json_build_object(
+            'institution', e.institution,
+            'area', e.area,
+            'degree', e.degree,
+            'start_date', e.start_date,
+            'end_date', e.end_date,
+            'location', e.location,
+            'summary', e.summary
+        ) ORDER BY e.id)
+        FROM cv_education e
+        WHERE e.user_id = u.id
+    ), '[]'::json),
+    'experience', coalesce((
+        SELECT json_agg(json_build_object(
+            'workplace', x.workplace,
+            'position', x.position,
+            'start_date', x.start_date,
+            'end_date', x.end_date,
+            'location', x.location,
+            'summary', x.summary,
+            'responsibilities', coalesce((
+                SELECT json_agg(json_build_object('responsibility', r.responsibility) ORDER BY r.id)
+                FROM cv_experience_responsibilities r
+                WHERE r.experience_id = x.id
+            ), '[]'::json),
+            'achievements', coalesce((
+                SELECT json_agg(json_build_object('achievement', a.achievement) ORDER BY a.id)
+                FROM cv_experience_achievements a
+                WHERE a.experience_id = x.id
+            ), '[]'::json)
+        ) ORDER BY x.id)
+        FROM cv_experience x
+        WHERE x.user_id = u.id
+    ), '[]'::json),
+    'projects', coalesce((
+        SELECT json_agg(json_build_object(
+            'name', pr.name,
+            'start_date', pr.start_date,
+            'end_date', pr.end_date,
+            'description', pr.description,
+            'location', pr.location,
+            'achievements', coalesce((
+                SELECT json_agg(json_build_object('achievement', pa.achievement) ORDER BY pa.id)
+                FROM cv_project_achievements pa
+                WHERE pa.project_id = pr.id
+            ), '[]'::json)
+        ) ORDER BY pr.id)
+        FROM cv_project pr
+        WHERE pr.user_id = u.id
+    ), '[]'::json),
+    'skills', coalesce((
+        SELECT json_agg(json_build_object(
+            'label', s.label,
+            'detail', s.detail
+        ) ORDER BY s.id)
+        FROM cv_skill s
+        WHERE s.user_id = u.id
+    ), '[]'::json)
+)
+FROM "user" u
+JOIN cv_personal_info p ON p.user_id = u.id
+WHERE u.id = :user_id
+"""
+
+_cv_json_query = text(f"SELECT ({CV_JSON_SQL})::text")
+
+def get_cv_json(db: Session, user_id: int) -> bytes:
+    try:
+        document = db.execute(_cv_json_query, {"user_id": user_id}).scalar()
+    except SQLAlchemyError:
+        raise HTTPException(status_code=500, detail="Error retrieving CV.")
+
+    # Sin personal_info el JOIN no devuelve fila, igual que el 404 de get_cv
+    if document is None:
+        raise HTTPException(status_code=404, detail="CV not found")
+
+    return document.encode("utf-8")
+
+async def get_cv_json_async(db: Session | AsyncSession, user_id: int) -> bytes:
+    generation, document = _cached_section(user_id, ("cv_json",))
+    if document is None:
+        document = await run_in_session(db, get_cv_json, user_id)
+        _cache_section(user_id, generation, ("cv_json",), document)
+    return document
+
+# document queda NULL mientras el usuario no tenga personal_info (GET /api/cv devuelve 404)
+_upsert_cv_document = text(f"""
+INSERT INTO cv_document (user_id, document, version, updated_at)
+VALUES (:user_id, ({CV_JSON_SQL})::jsonb, 1, now())
+ON CONFLICT (user_id) DO UPDATE
+SET document = EXCLUDED.document,
+    version = cv_document.version + 1,
+    updated_at = EXCLUDED.updated_at
+""")
+
+_backfill_cv_document = text(f"""
+INSERT INTO cv_document (user_id, document, version, updated_at)
+VALUES (:user_id, ({CV_JSON_SQL})::jsonb, 1, now())
+ON CONFLICT (user_id) DO NOTHING
+""")
+
+_cv_document_query = text("SELECT document::text FROM cv_document WHERE user_id = :user_id")
+
+_CV_DOCUMENT_LOCK_CLASS = 815_204_002
+
+def _rebuild_cv_document(db: Session | Connection, user_id: int):
+    # Serializa las escrituras del mismo usuario: el upsert toma su snapshot después del lock
+    # y ve lo que otra transacción concurrente haya confirmado mientras tanto
+    db.execute(
+        text("SELECT pg_advisory_xact_lock(:lock_class, :user_id)"),
+        {"lock_class": _CV_DOCUMENT_LOCK_CLASS, "user_id": user_id},
+    )
+    db.execute(_upsert_cv_document, {"user_id": user_id})
+
+def _touch_cv_document(db: Session, user_id: int):
+    # El flush manda los cambios pendientes para que el documento se arme con ellos
+    db.flush()
+    _rebuild_cv_document(db, user_id)
+    invalidate_after_commit(db, cv_cache, user_id)
+
+@event.listens_for(User, "after_update")
+def _touch_cv_document_basic_info(mapper, connection: Connection, target: User):
+    state = inspect(target)
+    if any(state.attrs[key].history.has_changes() for key in ("email", "firstname", "lastname")):
+        _rebuild_cv_document(connection, target.id)
+        db = object_session(target)
+        if db is not None:
+            invalidate_after_commit(db, cv_cache, target.id, connection=connection)
+        else:
+            cv_cache.pop(target.id)
+
+def get_cv_document(db: Session, user_id: int) -> bytes:
+    try:
+        row = db.execute(_cv_document_query, {"user_id": user_id}).first()
+        if row is None:
+            # CVs anteriores a cv_document: se genera la fila en la primera lectura
+            db.execute(_backfill_cv_document, {"user_id": user_id})
+            db.commit()
+            row = db.execute(_cv_document_query, {"user_id": user_id}).first()
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error retrieving CV.")
+
+    if row is None or row[0] is None:
+        raise HTTPException(status_code=404, detail="CV not found")
+
+    return row[0].encode("utf-8")
+
+async def get_cv_document_async(db: Session | AsyncSession, user_id: int) -> bytes:
+    generation, document = _cached_section(user_id, ("cv_document",))
+    if document is None:
+        document = await run_in_session(db, get_cv_document, user_id)
+        _cache_section(user_id, generation, ("cv_document",), document)
+    return document
+
+_cv_version_query = text("SELECT version FROM cv_document WHERE user_id = :user_id")
+
+def get_cv_version(db: Session, user_id: int) -> int | None:
+    # Sube con cada escritura del CV, así que sirve de ETag para el CV y todas sus secciones
+    try:
+        version = db.execute(_cv_version_query, {"user_id": user_id}).scalar()
+        if version is None:
+            db.execute(_backfill_cv_document, {"user_id": user_id})
+            db.commit()
+            version = db.execute(_cv_version_query, {"user_id": user_id}).scalar()
+    except SQLAlchemyError:
+        db.rollback()
+        return None
+    return version
+
+async def get_cv_version_async(db: Session | AsyncSession, user_id: int) -> int | None:
+    generation, version = _cached_section(user_id, ("version",))
+    if version is None:
+        version = await run_in_session(db, get_cv_version, user_id)
+        if version is not None:
+            _cache_section(user_id, generation, ("version",), version)
+    return version
+
+def _violates(error: SQLAlchemyError, constraint: str) -> bool:
+    # Solo la violación de ese índice único es un duplicado; un NOT NULL o una FK siguen siendo un 500.
+    # psycopg2 expone el nombre en diag y asyncpg en la excepción original
+    if not isinstance(error, IntegrityError):
+        return False
+    diag = getattr(error.orig, "diag", None)
+    name = diag.constraint_name if diag is not None else getattr(error.orig.__cause__, "constraint_name", None)
+    return name == constraint
+
 # Service functions for CV Personal Info
 def get_cv_personal_info(db: Session, user_id: int):
     result = db.query(Cv_personal_info).filter(Cv_personal_info.user_id == user_id).first()
@@ -84,6 +309,7 @@ def set_cv_personal_info(db: Session, user_id: int, data: CvPersonalInfoCreate):
             data_dict = data.model_dump(exclude_unset=True)
             for key, value in data_dict.items():
                 setattr(personal_info, key, value)
+            _touch_cv_document(db, user_id)
             db.commit()
             db.refresh(personal_info)
             return personal_info
@@ -99,6 +325,7 @@ def set_cv_personal_info(db: Session, user_id: int, data: CvPersonalInfoCreate):
                 website=data.website,
             )
             db.add(new_info)
+            _touch_cv_document(db, user_id)
             db.commit()
             db.refresh(new_info)
             return new_info
@@ -135,6 +362,7 @@ def patch_cv_personal_info(db: Session, user_id: int, data: CvPersonalInfoCreate
         data_dict = data.model_dump(exclude_unset=True)
         for key, value in data_dict.items():
             setattr(personal_info, key, value)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(personal_info)
         return personal_info
@@ -200,12 +428,18 @@ def set_cv_education(db: Session, user_id: int, data: CvEducationCreate):
             summary=data.summary,
         )
         db.add(new_info)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(new_info)
         return new_info
     
     except SQLAlchemyError as e:
         db.rollback()
+        if _violates(e, "uq_cv_education_entry"):
+            raise HTTPException(
+                status_code=400,
+                detail="Already exists an education entry with the same information.",
+            )
         raise HTTPException(
             status_code=500,
             detail="Error persisting CV education.",
@@ -229,12 +463,18 @@ def patch_cv_education(db: Session, user_id: int, data: CvEducationUpdate):
         data_dict = data.model_dump(exclude_unset=True)
         for key, value in data_dict.items():
             setattr(existing_info, key, value)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(existing_info)
         return existing_info
     
     except SQLAlchemyError as e:
         db.rollback()
+        if _violates(e, "uq_cv_education_entry"):
+            raise HTTPException(
+                status_code=400,
+                detail="Already exists an education entry with the same information.",
+            )
         raise HTTPException(
             status_code=500,
             detail="Error persisting CV education.",
@@ -250,8 +490,8 @@ def get_cv_experience(db: Session, user_id: int):
         result = (
             db.query(Cv_experience)
             .options(
-                joinedload(Cv_experience.responsibilities),  
-                joinedload(Cv_experience.achievements),      
+                selectinload(Cv_experience.responsibilities),
+                selectinload(Cv_experience.achievements),
             )
             .filter(Cv_experience.user_id == user_id)
             .all() 
@@ -298,12 +538,18 @@ def set_cv_experience(db: Session, user_id: int, data: CvExperienceCreate):
             summary=data.summary,
         )
         db.add(new_info)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(new_info)
         return new_info
     
     except SQLAlchemyError as e:
         db.rollback()
+        if _violates(e, "uq_cv_experience_entry"):
+            raise HTTPException(
+                status_code=400,
+                detail="Already exists an experience entry with the same information.",
+            )
         raise HTTPException(
             status_code=500,
             detail="Error persisting CV experience.",
@@ -326,12 +572,18 @@ def patch_cv_experience(db: Session, user_id: int, data: CvExperienceUpdate):
         data_dict = data.model_dump(exclude_unset=True)
         for key, value in data_dict.items():
             setattr(existing_info, key, value)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(existing_info)
         return existing_info
     
     except SQLAlchemyError as e:
         db.rollback()
+        if _violates(e, "uq_cv_experience_entry"):
+            raise HTTPException(
+                status_code=400,
+                detail="Already exists an experience entry with the same information.",
+            )
         raise HTTPException(
             status_code=500,
             detail="Error persisting CV experience.",
@@ -399,6 +651,7 @@ def set_cv_experience_responsibilities(db: Session, user_id: int, data: CvExperi
             experience_id=data.experience_id,
         )
         db.add(new_info)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(new_info)
         return new_info
@@ -437,6 +690,7 @@ def patch_cv_experience_responsibilities(db: Session, user_id: int, data: CvExpe
         data_dict = data.model_dump(exclude_unset=True)
         for key, value in data_dict.items():
             setattr(existing_info, key, value)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(existing_info)
         return existing_info
@@ -510,6 +764,7 @@ def set_cv_experience_achievements(db: Session, user_id: int, data: CvExperience
             experience_id=data.experience_id,
         )
         db.add(new_info)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(new_info)
         return new_info
@@ -548,6 +803,7 @@ def patch_cv_experience_achievements(db: Session, user_id: int, data: CvExperien
         data_dict = data.model_dump(exclude_unset=True)
         for key, value in data_dict.items():
             setattr(existing_info, key, value)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(existing_info)
         return existing_info
@@ -569,7 +825,7 @@ def get_cv_project(db: Session, user_id: int):
         result = ( 
             db.query(Cv_project)
             .options(
-                joinedload(Cv_project.achievements),      
+                selectinload(Cv_project.achievements),
             )
             .filter(Cv_project.user_id == user_id)
             .all() 
@@ -615,12 +871,18 @@ def set_cv_project(db: Session, user_id: int, data: CvProjectCreate):
             location=data.location
         )
         db.add(new_info)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(new_info)
         return new_info
     
     except SQLAlchemyError as e:
         db.rollback()
+        if _violates(e, "uq_cv_project_entry"):
+            raise HTTPException(
+                status_code=400,
+                detail="Already exists a project entry with the same information.",
+            )
         raise HTTPException(
             status_code=500,
             detail="Error persisting CV project.",
@@ -643,12 +905,18 @@ def patch_cv_project(db: Session, user_id: int, data: CvProjectUpdate):
         data_dict = data.model_dump(exclude_unset=True)
         for key, value in data_dict.items():
             setattr(existing_info, key, value)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(existing_info)
         return existing_info
     
     except SQLAlchemyError as e:
         db.rollback()
+        if _violates(e, "uq_cv_project_entry"):
+            raise HTTPException(
+                status_code=400,
+                detail="Already exists a project entry with the same information.",
+            )
         raise HTTPException(
             status_code=500,
             detail="Error persisting CV project.",
@@ -717,6 +985,7 @@ def set_cv_project_achievements(db: Session, user_id: int, data: CvProjectAchiev
             project_id=data.project_id,
         )
         db.add(new_info)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(new_info)
         return new_info
@@ -755,6 +1024,7 @@ def patch_cv_project_achievements(db: Session, user_id: int, data: CvProjectAchi
         data_dict = data.model_dump(exclude_unset=True)
         for key, value in data_dict.items():
             setattr(existing_info, key, value)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(existing_info)
         return existing_info
@@ -815,12 +1085,18 @@ def set_cv_skill(db: Session, user_id: int, data: CvSkillCreate):
             detail=data.detail            
         )
         db.add(new_info)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(new_info)
         return new_info
     
     except SQLAlchemyError as e:
         db.rollback()
+        if _violates(e, "uq_cv_skill_entry"):
+            raise HTTPException(
+                status_code=400,
+                detail="Already exists a skill entry with the same information.",
+            )
         raise HTTPException(
             status_code=500,
             detail="Error persisting CV skill.",
@@ -843,12 +1119,18 @@ def patch_cv_skill(db: Session, user_id: int, data: CvSkillUpdate):
         data_dict = data.model_dump(exclude_unset=True)
         for key, value in data_dict.items():
             setattr(existing_info, key, value)
+        _touch_cv_document(db, user_id)
         db.commit()
         db.refresh(existing_info)
         return existing_info
     
     except SQLAlchemyError as e:
         db.rollback()
+        if _violates(e, "uq_cv_skill_entry"):
+            raise HTTPException(
+                status_code=400,
+                detail="Already exists a skill entry with the same information.",
+            )
         raise HTTPException(
             status_code=500,
             detail="Error persisting CV project.",
@@ -857,3 +1139,111 @@ def patch_cv_skill(db: Session, user_id: int, data: CvSkillUpdate):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
+
+# Versiones async: el servicio y la validación del schema de respuesta corren dentro
+# de la sesión, que es donde todavía se pueden cargar las relaciones con asyncpg
+@lru_cache
+def _response_adapter(schema):
+    return TypeAdapter(schema)
+
+async def _run_validated(db: Session | AsyncSession, schema, fn, *args):
+    def call(session: Session):
+        return _response_adapter(schema).validate_python(fn(session, *args), from_attributes=True)
+    return await run_in_session(db, call)
+
+def _cached_section(user_id: int, section: tuple):
+    # La generación se toma antes de ir a la base de datos: si una escritura o un NOTIFY
+    # invalida al usuario durante el await, _cache_section descarta el valor leído
+    if not cv_cache.enabled:
+        return None, None
+    generation = cv_cache.generation()
+    sections = cv_cache.get(user_id)
+    value = sections.get(section) if sections else None
+    CACHE_REQUESTS.labels("cv", "miss" if value is None else "hit").inc()
+    return generation, value
+
+def _cache_section(user_id: int, generation: int | None, section: tuple, value):
+    if cv_cache.enabled:
+        cv_cache.update(user_id, {section: value}, generation=generation)
+
+async def _run_cached(db: Session | AsyncSession, user_id: int, section: tuple, schema, fn, *args):
+    generation, value = _cached_section(user_id, section)
+    if value is None:
+        value = await _run_validated(db, schema, fn, *args)
+        _cache_section(user_id, generation, section, value)
+    return value
+
+async def get_cv_async(db: Session | AsyncSession, user_id: int):
+    return await _run_cached(db, user_id, ("cv",), CvResponse, get_cv, user_id)
+
+async def get_cv_personal_info_async(db: Session | AsyncSession, user_id: int):
+    return await _run_cached(db, user_id, ("personal_info",), CvPersonalInfoResponse, get_cv_personal_info, user_id)
+
+async def set_cv_personal_info_async(db: Session | AsyncSession, user_id: int, data: CvPersonalInfoCreate):
+    return await _run_validated(db, CvPersonalInfoResponse, set_cv_personal_info, user_id, data)
+
+async def patch_cv_personal_info_async(db: Session | AsyncSession, user_id: int, data: CvPersonalInfoCreate):
+    return await _run_validated(db, CvPersonalInfoResponse, patch_cv_personal_info, user_id, data)
+
+async def get_cv_education_async(db: Session | AsyncSession, user_id: int):
+    return await _run_cached(db, user_id, ("education",), list[CvEducationResponse], get_cv_education, user_id)
+
+async def set_cv_education_async(db: Session | AsyncSession, user_id: int, data: CvEducationCreate):
+    return await _run_validated(db, CvEducationResponse, set_cv_education, user_id, data)
+
+async def patch_cv_education_async(db: Session | AsyncSession, user_id: int, data: CvEducationUpdate):
+    return await _run_validated(db, CvEducationResponse, patch_cv_education, user_id, data)
+
+async def get_cv_experience_async(db: Session | AsyncSession, user_id: int):
+    return await _run_cached(db, user_id, ("experience",), list[CvExperienceResponse], get_cv_experience, user_id)
+
+async def set_cv_experience_async(db: Session | AsyncSession, user_id: int, data: CvExperienceCreate):
+    return await _run_validated(db, CvExperienceResponse, set_cv_experience, user_id, data)
+
+async def patch_cv_experience_async(db: Session | AsyncSession, user_id: int, data: CvExperienceUpdate):
+    return await _run_validated(db, CvExperienceResponse, patch_cv_experience, user_id, data)
+
+async def get_cv_experience_responsibilities_async(db: Session | AsyncSession, user_id: int, experience_id: int):
+    return await _run_cached(db, user_id, ("experience_responsibilities", experience_id), list[CvExperienceResponsibilitiesResponse], get_cv_experience_responsibilities, user_id, experience_id)
+
+async def set_cv_experience_responsibilities_async(db: Session | AsyncSession, user_id: int, data: CvExperienceResponsibilitiesCreate):
+    return await _run_validated(db, CvExperienceResponsibilitiesResponse, set_cv_experience_responsibilities, user_id, data)
+
+async def patch_cv_experience_responsibilities_async(db: Session | AsyncSession, user_id: int, data: CvExperienceResponsibilitiesUpdate):
+    return await _run_validated(db, CvExperienceResponsibilitiesResponse, patch_cv_experience_responsibilities, user_id, data)
+
+async def get_cv_experience_achievements_async(db: Session | AsyncSession, user_id: int, experience_id: int):
+    return await _run_cached(db, user_id, ("experience_achievements", experience_id), list[CvExperienceAchievementsResponse], get_cv_experience_achievements, user_id, experience_id)
+
+async def set_cv_experience_achievements_async(db: Session | AsyncSession, user_id: int, data: CvExperienceAchievementsCreate):
+    return await _run_validated(db, CvExperienceAchievementsResponse, set_cv_experience_achievements, user_id, data)
+
+async def patch_cv_experience_achievements_async(db: Session | AsyncSession, user_id: int, data: CvExperienceAchievementsUpdate):
+    return await _run_validated(db, CvExperienceAchievementsResponse, patch_cv_experience_achievements, user_id, data)
+
+async def get_cv_project_async(db: Session | AsyncSession, user_id: int):
+    return await _run_cached(db, user_id, ("project",), list[CvProjectResponse], get_cv_project, user_id)
+
+async def set_cv_project_async(db: Session | AsyncSession, user_id: int, data: CvProjectCreate):
+    return await _run_validated(db, CvProjectResponse, set_cv_project, user_id, data)
+
+async def patch_cv_project_async(db: Session | AsyncSession, user_id: int, data: CvProjectUpdate):
+    return await _run_validated(db, CvProjectResponse, patch_cv_project, user_id, data)
+
+async def get_cv_project_achievements_async(db: Session | AsyncSession, user_id: int, project_id: int):
+    return await _run_cached(db, user_id, ("project_achievements", project_id), list[CvProjectAchievementsResponse], get_cv_project_achievements, user_id, project_id)
+
+async def set_cv_project_achievements_async(db: Session | AsyncSession, user_id: int, data: CvProjectAchievementsCreate):
+    return await _run_validated(db, CvProjectAchievementsResponse, set_cv_project_achievements, user_id, data)
+
+async def patch_cv_project_achievements_async(db: Session | AsyncSession, user_id: int, data: CvProjectAchievementsUpdate):
+    return await _run_validated(db, CvProjectAchievementsResponse, patch_cv_project_achievements, user_id, data)
+
+async def get_cv_skill_async(db: Session | AsyncSession, user_id: int):
+    return await _run_cached(db, user_id, ("skill",), list[CvSkillResponse], get_cv_skill, user_id)
+
+async def set_cv_skill_async(db: Session | AsyncSession, user_id: int, data: CvSkillCreate):
+    return await _run_validated(db, CvSkillResponse, set_cv_skill, user_id, data)
+
+async def patch_cv_skill_async(db: Session | AsyncSession, user_id: int, data: CvSkillUpdate):
+    return await _run_validated(db, CvSkillResponse, patch_cv_skill, user_id, data)
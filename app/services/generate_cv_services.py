@@ -1,8 +1,10 @@
 import json
+import time
 import httpx
 from typing import Any, Iterable
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
+from app.core.metrics import observe_outbound
 from app.core.vault import get_url_groq_service
 from app.schemas.generate import CvGenerateAIRequest
 from app.services.cv_services import get_cv
@@ -73,17 +75,24 @@ def generate_cv_ia(db: Session, user_id: int, job_offer: CvGenerateAIRequest) ->
         payload = jsonable_encoder(cv_data)
         data = _format_data(payload)
 
-        request = httpx.post(
-            f"{get_url_groq_service()}/cv/create/external",
-            json={
-                "userDataPrompt": data,
-                "jobOfferPrompt": job_offer.job_offer,
-            },
-            headers={
-                "Content-Type": "application/json",
-                "x-token-key": user.api_key
-            },
-        )
+        url = f"{get_url_groq_service()}/cv/create/external"
+        started = time.perf_counter()
+        status = "error"
+        try:
+            request = httpx.post(
+                url,
+                json={
+                    "userDataPrompt": data,
+                    "jobOfferPrompt": job_offer.job_offer,
+                },
+                headers={
+                    "Content-Type": "application/json",
+                    "x-token-key": user.api_key
+                },
+            )
+            status = request.status_code
+        finally:
+            observe_outbound("Generate CV with IA", httpx.URL(url).host, status, time.perf_counter() - started)
 
         if request.status_code != 201:
             raise Exception(f"Error generating CV")
@@ -1,22 +1,30 @@
 import httpx
 from datetime import datetime, timedelta
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
+from app.core.database import run_in_session
 from app.core.logging import outboundLogging
-from app.core.security import create_register_token, hash_password
+from app.core.security import create_register_token, hash_password_async
 from app.core.vault import get_url_groq_service
 from app.models.user import RegisteredUser, TwoFA, User
 from app.schemas.user import UserCreate, UserRegister
 from app.services.two_fa_service import two_fa_generate_code
 from app.services.email_services import send_email_verification
 
-def create_user_service(db: Session, user: UserCreate):
-    userExists = db.query(User).filter(User.email == user.email).first()
+# Las funciones async aceptan Session o AsyncSession: los accesos a la base de datos
+# pasan por run_in_session y el resto (bcrypt, email, HTTP) se hace con await.
+def _commit_and_refresh(db: Session, instance):
+    db.commit()
+    db.refresh(instance)
+
+async def create_user_service(db: Session | AsyncSession, user: UserCreate):
+    userExists = await run_in_session(db, get_user_service_by_email, user.email)
     if userExists:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = hash_password(user.password)
+    hashed_password = await hash_password_async(user.password)
 
     db_user = User(
         firstname=user.firstname,
@@ -25,28 +33,46 @@ def create_user_service(db: Session, user: UserCreate):
         password=hashed_password  
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await run_in_session(db, _commit_and_refresh, db_user)
     return db_user
 
-async def register(db: Session, user: UserRegister):
+def _latest_pending_registration(db: Session, email: str):
+    return (
+        db.query(RegisteredUser)
+        .filter(
+            RegisteredUser.email == email,
+            RegisteredUser.is_verified == False,
+        )
+        .order_by(RegisteredUser.created_at.desc())
+        .first()
+    )
+
+def _delete_pending_registrations(db: Session, email: str):
+    pendings = (
+        db.query(RegisteredUser)
+        .filter(
+            RegisteredUser.email == email,
+            RegisteredUser.is_verified == False,
+        )
+        .all()
+    )
+
+    for p in pendings:
+        db.query(TwoFA).filter(TwoFA.user_id == p.id).delete(synchronize_session=False)
+        db.delete(p)
+
+    db.commit()
+
+async def register(db: Session | AsyncSession, user: UserRegister):
     try:
-        user_exists = db.query(User).filter(User.email == user.email).first()
+        user_exists = await run_in_session(db, get_user_service_by_email, user.email)
         if user_exists:
             raise HTTPException(status_code=400, detail="Email already registered")
 
         ttl = timedelta(minutes=15)
         now = datetime.utcnow()
 
-        pending_latest = (
-            db.query(RegisteredUser)
-            .filter(
-                RegisteredUser.email == user.email,
-                RegisteredUser.is_verified == False,
-            )
-            .order_by(RegisteredUser.created_at.desc())
-            .first()
-        )
+        pending_latest = await run_in_session(db, _latest_pending_registration, user.email)
 
         if pending_latest:
             age = now - pending_latest.created_at
@@ -57,22 +83,9 @@ async def register(db: Session, user: UserRegister):
                     detail="A registration attempt was made recently. Please check your email for the verification code or try again later.",
                 )
 
-            pendings = (
-                db.query(RegisteredUser)
-                .filter(
-                    RegisteredUser.email == user.email,
-                    RegisteredUser.is_verified == False,
-                )
-                .all()
-            )
+            await run_in_session(db, _delete_pending_registrations, user.email)
 
-            for p in pendings:
-                db.query(TwoFA).filter(TwoFA.user_id == p.id).delete(synchronize_session=False)
-                db.delete(p)
-
-            db.commit()
-
-        hashed_password = hash_password(user.password)
+        hashed_password = await hash_password_async(user.password)
 
         db_user_register = RegisteredUser(
             firstname=user.firstname,
@@ -81,7 +94,7 @@ async def register(db: Session, user: UserRegister):
             password=hashed_password,
         )
 
-        code = two_fa_generate_code(db)
+        code = await run_in_session(db, two_fa_generate_code)
 
         two_fa_entry = TwoFA(
             code=code,
@@ -91,7 +104,7 @@ async def register(db: Session, user: UserRegister):
 
         db.add(db_user_register)
         db.add(two_fa_entry)
-        db.commit()
+        await run_in_session(db, Session.commit)
 
         await send_email_verification(
             to=user.email,
@@ -102,24 +115,39 @@ async def register(db: Session, user: UserRegister):
         return code
 
     except SQLAlchemyError as e:
-        db.rollback()
+        await run_in_session(db, Session.rollback)
         raise HTTPException(status_code=500, detail="Error processing registration.")
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        db.rollback()
+        await run_in_session(db, Session.rollback)
         raise HTTPException(status_code=500, detail="Internal Server Error during registration")
 
-async def confirm_registration(db: Session, code: str):
+def _pending_confirmation(db: Session, code: str):
+    two_fa_entry = db.query(TwoFA).filter(TwoFA.code == code).first()
+    if not two_fa_entry:
+        return None, None
+    return two_fa_entry, two_fa_entry.user
+
+def _complete_registration(db: Session, db_user: User, registered_user: RegisteredUser, two_fa_entry: TwoFA):
+    db.add(db_user)
+
+    registered_user.is_verified = True
+    db.delete(two_fa_entry)
+
+    db.commit()
+    # AsyncSessionLocal no expira en commit; sin esto la respuesta incluiría el hash de la contraseña
+    db.expire(registered_user)
+
+async def confirm_registration(db: Session | AsyncSession, code: str):
     try:
         ttl = timedelta(minutes=15)
         now = datetime.utcnow()
 
-        two_fa_entry = db.query(TwoFA).filter(TwoFA.code == code).first()
+        two_fa_entry, registered_user = await run_in_session(db, _pending_confirmation, code)
         if not two_fa_entry:
             raise HTTPException(status_code=400, detail="Invalid verification code.")
 
-        registered_user = two_fa_entry.user
         if not registered_user or registered_user.is_verified:
             raise HTTPException(status_code=400, detail="Invalid verification code.")
 
@@ -127,7 +155,7 @@ async def confirm_registration(db: Session, code: str):
         if not created_at or (now - created_at) > ttl:
             raise HTTPException(status_code=400, detail="Verification code has expired.")
 
-        if db.query(User).filter(User.email == registered_user.email).first():
+        if await run_in_session(db, get_user_service_by_email, registered_user.email):
             raise HTTPException(status_code=400, detail="Email already registered.")
 
         register_token = create_register_token(
@@ -153,7 +181,7 @@ async def confirm_registration(db: Session, code: str):
         }
 
         try:
-            async with outboundLogging(db, operation="Register user in external service") as client:
+            async with outboundLogging(operation="Register user in external service") as client:
                 resp = await client.post(external_service_url, json=payload, headers=headers)
 
             resp.raise_for_status()
@@ -177,22 +205,17 @@ async def confirm_registration(db: Session, code: str):
             password=registered_user.password,
             api_key=body.get("api_key")
         )
-        db.add(db_user)
-
-        registered_user.is_verified = True
-        db.delete(two_fa_entry)
-
-        db.commit()
+        await run_in_session(db, _complete_registration, db_user, registered_user, two_fa_entry)
         return registered_user
 
     except SQLAlchemyError as e:
-        db.rollback()
+        await run_in_session(db, Session.rollback)
         raise HTTPException(status_code=500, detail="Error confirming registration.")
     except HTTPException as http_exc:
-        db.rollback()
+        await run_in_session(db, Session.rollback)
         raise http_exc
     except Exception as e:
-        db.rollback()
+        await run_in_session(db, Session.rollback)
         raise HTTPException(status_code=500, detail="Internal Server Error during registration confirmation")
 
 def get_users_service(db: Session):
@@ -202,4 +225,13 @@ def get_user_service_by_email(db: Session, user_email: str):
     return db.query(User).filter(User.email == user_email).first()
 
 def get_user_service_by_id(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
\ No newline at end of file
+    return db.query(User).filter(User.id == user_id).first()
+
+async def get_users_service_async(db: Session | AsyncSession):
+    return await run_in_session(db, get_users_service)
+
+async def get_user_service_by_email_async(db: Session | AsyncSession, user_email: str):
+    return await run_in_session(db, get_user_service_by_email, user_email)
+
+async def get_user_service_by_id_async(db: Session | AsyncSession, user_id: int):
+    return await run_in_session(db, get_user_service_by_id, user_id)
\ No newline at end of file
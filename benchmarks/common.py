@@ -0,0 +1,41 @@
+# Utilidades compartidas por los benchmarks HTTP; los benchmarks se lanzan desde la raíz
+# del repo con python -m benchmarks.<script>, así se importan tanto app como benchmarks
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+import httpx
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+async def run_requests(
+    concurrency: int,
+    requests: int,
+    call: Callable[[], Awaitable[httpx.Response]],
+) -> tuple[list[float], dict[int, int], float]:
+    # Reparte `requests` llamadas entre `concurrency` workers; devuelve latencias, status y duración total
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+
+    async def worker():
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            response = await call()
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latencies, statuses, time.perf_counter() - started
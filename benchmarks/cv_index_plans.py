@@ -0,0 +1,159 @@
+# Planes de las lecturas de secciones del CV y de las comprobaciones de duplicados de
+# set_cv_*, sin y con los índices user_id / experience_id / project_id y uq_cv_*_entry.
+# Usa las variables POSTGRES_* de la app y trabaja en un esquema aparte:
+#   python -m benchmarks.cv_index_plans --users 1000000
+#
+# El esquema se borra al terminar salvo con --keep; la carga de 1M usuarios tarda unos minutos.
+import argparse
+import json
+import time
+
+from sqlalchemy import text
+
+from app.core.database import Base, engine
+from app.models.cv import (
+    Cv_document, Cv_education, Cv_experience, Cv_experience_achievements, Cv_experience_responsibilities,
+    Cv_personal_info, Cv_project, Cv_project_achievements, Cv_skill, Cv_social_network,
+)
+from app.models.user import User
+
+TABLES = [
+    User.__table__, Cv_personal_info.__table__, Cv_social_network.__table__, Cv_education.__table__,
+    Cv_experience.__table__, Cv_experience_responsibilities.__table__, Cv_experience_achievements.__table__,
+    Cv_project.__table__, Cv_project_achievements.__table__, Cv_skill.__table__, Cv_document.__table__,
+]
+
+# Índices cuyo efecto se mide: se quitan antes de la primera pasada y se crean para la segunda
+INDEXES = [
+    index
+    for table in TABLES if table.name.startswith("cv_")
+    for index in table.indexes
+    if index.name.startswith("uq_") or index.name.endswith(("_user_id", "_experience_id", "_project_id"))
+]
+
+SEED = [
+    """INSERT INTO "user" (firstname, lastname, email, password, is_active)
+       SELECT 'First' || g, 'Last' || g, 'user' || g || '@example.com', 'x', true
+       FROM generate_series(1, :users) g""",
+    """INSERT INTO cv_personal_info (user_id, about_me) SELECT id, 'About ' || id FROM "user" """,
+    """INSERT INTO cv_social_network (user_id, network_name, profile_link)
+       SELECT u.id, 'network ' || n, 'https://example.com/' || u.id || '/' || n
+       FROM "user" u, generate_series(1, :rows) n""",
+    """INSERT INTO cv_education (user_id, institution, area, degree, start_date, end_date)
+       SELECT u.id, 'Institution ' || n, 'Area', 'Degree ' || n, '20' || lpad(n::text, 2, '0'), NULL
+       FROM "user" u, generate_series(1, :rows) n""",
+    """INSERT INTO cv_experience (user_id, workplace, position, start_date, end_date)
+       SELECT u.id, 'Workplace ' || n, 'Position ' || n, '20' || lpad(n::text, 2, '0'), NULL
+       FROM "user" u, generate_series(1, :rows) n""",
+    """INSERT INTO cv_experience_responsibilities (experience_id, responsibility)
+       SELECT e.id, 'Responsibility ' || n FROM cv_experience e, generate_series(1, :rows) n""",
+    """INSERT INTO cv_experience_achievements (experience_id, achievement)
+       SELECT e.id, 'Achievement ' || n FROM cv_experience e, generate_series(1, :rows) n""",
+    """INSERT INTO cv_project (user_id, name, start_date, end_date, description)
+       SELECT u.id, 'Project ' || n, '20' || lpad(n::text, 2, '0'), NULL, repeat('Description ', 20) || n
+       FROM "user" u, generate_series(1, :rows) n""",
+    """INSERT INTO cv_project_achievements (project_id, achievement)
+       SELECT p.id, 'Achievement ' || n FROM cv_project p, generate_series(1, :rows) n""",
+    """INSERT INTO cv_skill (user_id, label, detail)
+       SELECT u.id, 'Skill ' || n, 'Detail ' || n FROM "user" u, generate_series(1, :rows) n""",
+]
+
+# Las mismas consultas que emiten get_cv / get_cv_* (selectinload) y las comprobaciones de set_cv_*
+QUERIES = [
+    ("education", "SELECT * FROM cv_education WHERE user_id = :user_id"),
+    ("experience", "SELECT * FROM cv_experience WHERE user_id = :user_id"),
+    ("responsibilities", "SELECT * FROM cv_experience_responsibilities WHERE experience_id IN :experience_ids"),
+    ("exp. achievements", "SELECT * FROM cv_experience_achievements WHERE experience_id IN :experience_ids"),
+    ("project", "SELECT * FROM cv_project WHERE user_id = :user_id"),
+    ("proj. achievements", "SELECT * FROM cv_project_achievements WHERE project_id IN :project_ids"),
+    ("skill", "SELECT * FROM cv_skill WHERE user_id = :user_id"),
+    ("social network", "SELECT * FROM cv_social_network WHERE user_id = :user_id"),
+    ("dup. education", """SELECT * FROM cv_education WHERE user_id = :user_id AND institution = 'Institution 1'
+                          AND degree = 'Degree 1' AND start_date = '2001' AND end_date IS NULL LIMIT 1"""),
+    ("dup. experience", """SELECT * FROM cv_experience WHERE user_id = :user_id AND workplace = 'Workplace 1'
+                           AND position = 'Position 1' AND start_date = '2001' AND end_date IS NULL LIMIT 1"""),
+    ("dup. project", """SELECT * FROM cv_project WHERE user_id = :user_id AND name = 'Project 1'
+                        AND start_date = '2001' AND end_date IS NULL
+                        AND description = repeat('Description ', 20) || '1' LIMIT 1"""),
+    ("dup. skill", """SELECT * FROM cv_skill WHERE label = 'Skill 1' AND detail = 'Detail 1'
+                      AND user_id = :user_id LIMIT 1"""),
+]
+
+def _scan_nodes(plan: dict) -> list[str]:
+    nodes = [plan["Node Type"]] if "Scan" in plan["Node Type"] else []
+    for child in plan.get("Plans", []):
+        nodes += _scan_nodes(child)
+    return nodes
+
+def _explain(conn, params: dict) -> dict:
+    results = {}
+    for name, sql in QUERIES:
+        # psycopg2 pasa las tuplas como (a, b, ...), igual que el IN de selectinload
+        raw = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+        explain = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+        plan = explain["Plan"]
+        results[name] = {
+            "scans": ", ".join(_scan_nodes(plan)),
+            "ms": explain["Execution Time"],
+            "buffers": plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0),
+        }
+    return results
+
+def main(args):
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {args.schema}"))
+        conn.execute(text(f"SET search_path TO {args.schema}"))
+        Base.metadata.create_all(conn, tables=TABLES)
+        for index in INDEXES:
+            index.drop(bind=conn)
+        conn.commit()
+
+        started = time.perf_counter()
+        for sql in SEED:
+            conn.execute(text(sql), {"users": args.users, "rows": args.rows})
+            conn.commit()
+        print(f"Seeded {args.users} users, {args.rows} rows per section, in {time.perf_counter() - started:.1f} s")
+
+        conn.execute(text("ANALYZE"))
+        # Un usuario del medio de la tabla: con seq scan se recorre casi todo
+        user_id = args.users // 2
+        params = {
+            "user_id": user_id,
+            "experience_ids": tuple(conn.execute(
+                text("SELECT id FROM cv_experience WHERE user_id = :user_id"), {"user_id": user_id}
+            ).scalars()),
+            "project_ids": tuple(conn.execute(
+                text("SELECT id FROM cv_project WHERE user_id = :user_id"), {"user_id": user_id}
+            ).scalars()),
+        }
+        before = _explain(conn, params)
+
+        started = time.perf_counter()
+        for index in INDEXES:
+            index.create(bind=conn)
+        conn.commit()
+        print(f"Created {len(INDEXES)} indexes in {time.perf_counter() - started:.1f} s")
+        conn.execute(text("ANALYZE"))
+        after = _explain(conn, params)
+
+        print(f"\n{'query':<20}{'without indexes':<42}{'with indexes':<42}")
+        for name, _ in QUERIES:
+            old, new = before[name], after[name]
+            print(
+                f"{name:<20}"
+                f"{old['scans'][:22]:<22}{old['ms']:8.2f} ms {old['buffers']:7} buf  "
+                f"{new['scans'][:22]:<22}{new['ms']:8.2f} ms {new['buffers']:7} buf"
+            )
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {args.schema} CASCADE"))
+            conn.commit()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CV section reads and duplicate checks, with and without indexes")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--rows", type=int, default=2, help="rows per CV section and per user")
+    parser.add_argument("--schema", default="cv_index_bench")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema")
+    main(parser.parse_args())
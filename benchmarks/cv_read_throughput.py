@@ -0,0 +1,52 @@
+# Throughput de GET /api/cv concurrente, camino psycopg2 frente a asyncpg. Se arrancan
+# dos instancias del mismo build, una con DB_ASYNC=false y otra con DB_ASYNC=true:
+#   DB_ASYNC=false uvicorn app.main:app --port 8000
+#   DB_ASYNC=true  uvicorn app.main:app --port 8001
+#   python -m benchmarks.cv_read_throughput --email user@example.com --password secret \
+#       --url sync=http://localhost:8000 --url async=http://localhost:8001
+#
+# El usuario tiene que tener un CV (al menos personal-info) para que GET /api/cv devuelva 200.
+import argparse
+import asyncio
+import statistics
+
+import httpx
+
+from benchmarks.common import percentile, run_requests
+
+async def _run(name: str, url: str, args):
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        response = await client.post("/api/auth/login", json={"email": args.email, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        # Calentamiento: caché de usuario, pool y planes de Postgres
+        for _ in range(args.warmup):
+            await client.get("/api/cv", headers=headers)
+
+        latencies, statuses, elapsed = await run_requests(
+            args.concurrency, args.requests, lambda: client.get("/api/cv", headers=headers)
+        )
+
+    print(
+        f"{name:>6}: {args.requests / elapsed:7.1f} req/s  "
+        f"p50 {statistics.median(latencies) * 1000:6.1f} ms  "
+        f"p99 {percentile(latencies, 0.99) * 1000:6.1f} ms  statuses {statuses}"
+    )
+
+async def main(args):
+    print(f"GET /api/cv x {args.requests}, concurrency {args.concurrency}")
+    for target in args.url:
+        name, _, url = target.partition("=")
+        await _run(name, url, args)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GET /api/cv throughput, sync vs async database path")
+    parser.add_argument("--url", action="append", required=True, help="name=url, repeatable")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
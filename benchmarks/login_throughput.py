@@ -0,0 +1,56 @@
+# Throughput de login contra una instancia en marcha, p. ej.:
+#   python -m benchmarks.login_throughput --url http://localhost:8000 \
+#       --email user@example.com --password secret --concurrency 32 --requests 400
+#
+# Mientras corren los logins se sondea GET /metrics, que no toca la base de datos:
+# su latencia muestra cuánto bloquea bcrypt el event loop del worker.
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from benchmarks.common import percentile, run_requests
+
+async def _probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list[float]):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/metrics")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        probe_latencies: list[float] = []
+        stop = asyncio.Event()
+
+        probe = asyncio.create_task(_probe(client, stop, probe_latencies))
+        login_latencies, statuses, elapsed = await run_requests(
+            args.concurrency,
+            args.requests,
+            lambda: client.post("/api/auth/login", json={"email": args.email, "password": args.password}),
+        )
+        stop.set()
+        await probe
+
+    print(f"logins: {args.requests} in {elapsed:.2f}s -> {args.requests / elapsed:.1f} req/s, statuses {statuses}")
+    print(
+        f"login latency  p50 {statistics.median(login_latencies) * 1000:.1f} ms  "
+        f"p99 {percentile(login_latencies, 0.99) * 1000:.1f} ms"
+    )
+    if probe_latencies:
+        print(
+            f"/metrics probe p50 {statistics.median(probe_latencies) * 1000:.1f} ms  "
+            f"p99 {percentile(probe_latencies, 0.99) * 1000:.1f} ms  ({len(probe_latencies)} probes)"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent login throughput benchmark")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=400)
+    asyncio.run(main(parser.parse_args()))